@@ -1,18 +1,34 @@
 import math
 import random
+import sys
+import time
+import threading
+import queue
+import cProfile
+import pstats
+import tracemalloc
+from collections import Counter
+from multiprocessing import shared_memory
+from contextlib import contextmanager
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, ttk, filedialog
 from dataclasses import dataclass, field
 import requests
-import folium
-from folium import plugins
 import webbrowser
 from typing import List, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import os
+import json
+import csv
+import hashlib
+import shutil
+from collections import OrderedDict
+from bisect import bisect_left
+from dataclasses import asdict
 from sklearn.cluster import KMeans
 import numpy as np
+from osm_router import LocalRoutingEngine, haversine as straight_line_distance  # kuş uçuşu mesafe (km)
 
 # Genetik algoritma parametreleri
 NO_GENERATIONS = 800
@@ -21,6 +37,50 @@ CROSSOVER_RATE = 0.9
 MUTATION_RATE = 0.35
 NO_OF_MUTATIONS = 7
 KEEP_BEST = True
+TOURNAMENT_SIZE = 3
+SEEDED_FRACTION = 0.5  # başlangıç popülasyonunda tohum turlardan türetilen bireylerin oranı
+STAGNATION_GENERATIONS = 100  # en iyi uygunluk bu kadar nesil iyileşmezse erken dur
+FITNESS_CACHE_SIZE = 5000  # bellekte tutulacak en fazla tur uygunluğu (en son kullanılanlar)
+TIME_BUDGET = None  # saniye cinsinden en uzun çözüm süresi (None: sınırsız)
+PROGRESS_INTERVAL = 0.5  # saniye; ara sonuçların (en iyi tur) en sık bildirilme aralığı
+RANDOM_SEED = 42  # istasyon yerleşimi ve GA için tohum; None ile her çalıştırma farklı sonuç verir
+
+# Şarj planlama parametreleri
+STATION_PLACEMENT_METHODS = ('kmeans', 'medoid', 'farthest')
+CHARGE_RESERVE = 5.0  # batarya hiçbir noktada bu yüzdenin altına düşmemeli
+
+# Talep noktası dosyası parametreleri
+DEMAND_FILE = 'talep_noktalari_guncellenmis.xlsx'
+DEMAND_COLUMNS = ('Mahalleler', 'X', 'Y')  # mahalle adı, boylam, enlem
+DEMAND_CHUNK_SIZE = 50000  # tek seferde işlenecek satır sayısı
+
+# Mesafe matrisi parametreleri
+MATRIX_DIR = 'mesafe_matrisi'
+OSRM_TABLE_URL = "http://router.project-osrm.org/table/v1/driving/"
+OSRM_TABLE_BLOCK = 50  # tek table isteğindeki en fazla kaynak/hedef sayısı
+FALLBACK_SPEED_KMH = 30.0  # OSRM yanıt vermediğinde süre tahmini için ortalama hız
+
+# OSRM erişim parametreleri
+OSRM_TIMEOUT = 5  # saniye
+OSRM_CACHE_SIZE = 100000  # bellekte tutulacak en fazla çift sorgu sonucu
+BREAKER_FAILURE_THRESHOLD = 3  # devre kesicinin açılması için art arda hata sayısı
+BREAKER_COOLDOWN = 60  # saniye; devre açıkken tüm istekler yerel tahmine gider
+ESTIMATOR_SAMPLES = 20000  # yol katsayısı kalibrasyonunda kullanılacak en fazla örnek
+OSRM_NEAREST_URL = "http://router.project-osrm.org/nearest/v1/driving/"
+SNAP_TO_ROAD = True  # OSRM isteklerinden önce koordinatları en yakın yol noktasına oturt
+SNAP_CACHE_SIZE = 100000  # bellekte tutulacak en fazla ham koordinat -> yol noktası eşlemesi
+GEOMETRY_CACHE_SIZE = 10000  # bellekte tutulacak en fazla ayak geometrisi
+
+# Dışa aktarma parametreleri
+EXPORT_FORMATS = ('geojson', 'npz', 'csv')
+COORD_SCALE = 1e6  # npz çıktısında koordinatlar 1e-6 derece hassasiyetle int32 olarak saklanır
+
+# Çözüm önbelleği parametreleri
+SOLUTION_CACHE_DIR = 'rota_onbellegi'
+SOLUTION_CACHE_SIZE = 64  # diskte tutulacak en fazla çözüm sayısı
+
+# Paralel süreç parametreleri
+SHARED_ALIGN = 64  # paylaşımlı bellek bloğunda her dizinin başlangıç hizası (bayt)
 
 @dataclass
 class ChargingStation:
@@ -35,6 +95,7 @@ class WasteCollectionPoint:
     name: str
     lat: float
     lon: float
+    period: int = 1  # kaç günde bir toplanacağı (1: her gün, 2: gün aşırı, 7: haftalık)
 
 @dataclass
 class ElectricVehicle:
@@ -42,9 +103,14 @@ class ElectricVehicle:
     max_range: float = 500.0  # km cinsinden maksimum menzil
     current_charge_percentage: float = 100.0  # yüzde cinsinden mevcut şarj
     charging_rate: float = 200.0  # yüzde/saat cinsinden şarj hızı
+    consumption_per_km: float = 1.0  # km başına batarya yüzdesi
+
+    @staticmethod
+    def energy_for(distance, consumption_per_km: float = 1.0):
+        return distance * consumption_per_km  # Varsayılan: her 10 km'de %10 azalma
 
     def drive(self, distance: float):
-        energy_consumed = (distance / 10) * 10  # Her 10 km'de %10 azalma
+        energy_consumed = self.energy_for(distance, self.consumption_per_km)
         self.current_charge_percentage -= energy_consumed
         return max(0, self.current_charge_percentage)
 
@@ -55,6 +121,46 @@ class ElectricVehicle:
         charge_amount = duration * (self.charging_rate / 60)  # duration dakika cinsinden
         self.current_charge_percentage = min(100, self.current_charge_percentage + charge_amount)
 
+@dataclass
+class VehicleType:
+    """Filodaki bir araç tipi: batarya, yüke bağlı tüketim modeli ve şarj gücü.
+
+    Yük (ton) verilmeyen tüm hesaplar tam yükle, yani en kötü durum tüketimiyle yapılır.
+    """
+    name: str
+    battery_kwh: float = 100.0
+    consumption_kwh_per_km: float = 0.8  # boş araç tüketimi
+    payload_kwh_per_km_t: float = 0.02  # taşınan her ton için ek tüketim
+    payload_capacity_t: float = 10.0
+    charging_power_kw: float = 200.0
+
+    def consumption(self, payload_t: float = None) -> float:
+        """Km başına tüketim (kWh); yük verilmezse tam yük (en kötü durum) kabul edilir"""
+        payload_t = self.payload_capacity_t if payload_t is None else payload_t
+        return self.consumption_kwh_per_km + self.payload_kwh_per_km_t * payload_t
+
+    def energy_matrix(self, distance, payload_t: float = None) -> np.ndarray:
+        """Mesafe matrisinden (km) batarya yüzdesi cinsinden enerji maliyeti matrisi"""
+        return np.asarray(distance, dtype=np.float64) * (self.consumption(payload_t) / self.battery_kwh * 100)
+
+    def vehicle(self, vehicle_id: int, payload_t: float = None) -> ElectricVehicle:
+        """Bu tipin (verilen yükteki) tüketimiyle sürülen araç"""
+        consumption = self.consumption(payload_t)
+        return ElectricVehicle(id=vehicle_id,
+                               max_range=self.battery_kwh / consumption,
+                               charging_rate=self.charging_power_kw / self.battery_kwh * 100,
+                               consumption_per_km=consumption / self.battery_kwh * 100)
+
+# Tam yükte 'standart' tip ElectricVehicle.energy_for ile aynı tüketimi (km başına %1) verir
+VEHICLE_TYPES = {
+    'standart': VehicleType('standart'),
+    'kucuk': VehicleType('kucuk', battery_kwh=60.0, consumption_kwh_per_km=0.5, payload_kwh_per_km_t=0.03,
+                         payload_capacity_t=4.0, charging_power_kw=100.0),
+    'buyuk': VehicleType('buyuk', battery_kwh=250.0, consumption_kwh_per_km=1.3, payload_kwh_per_km_t=0.025,
+                         payload_capacity_t=18.0, charging_power_kw=300.0),
+}
+DEFAULT_VEHICLE_TYPE = 'standart'
+
 @dataclass
 class Location:
     name: str
@@ -64,20 +170,1311 @@ class Location:
 @dataclass
 class Chromosome:
     stops: List[int] = field(default_factory=list)
-    fitness: float = 0.0
+    fitness: float = 0.0  # şarj sapmaları dahil toplam rota mesafesi (km); düşük olan daha iyi
+
+@dataclass
+class SolverProgress:
+    generation: int
+    cost: float  # şarj sapmaları dahil en iyi tur maliyeti (km)
+    stops: np.ndarray  # başlangıç noktası hariç en iyi ziyaret sırası
+    elapsed: float  # saniye
+    final: bool = False  # aramanın son sonucu mu
+
+class PointStore:
+    """Noktaları sütun bazlı NumPy dizilerinde tutar (id, enlem, boylam ve ek nitelikler).
+
+    Koordinatlar (N, 2) boyutlu tek bir float64 dizisinde (enlem, boylam) sırasıyla saklanır;
+    ``lat`` ve ``lon`` bu dizinin kopyasız görünümleridir.
+    """
+    __slots__ = ('ids', 'coords', 'names', 'attrs', '_name_index')
+
+    def __init__(self, ids, coords, names=None, attrs=None):
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        n = len(self.coords)
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64).reshape(-1)
+        if len(self.ids) != n:
+            raise ValueError("id ve koordinat dizilerinin uzunlukları eşleşmiyor")
+        self.names = np.empty(n, dtype=object)
+        self.names[:] = list(names) if names is not None else [''] * n
+        self.attrs = {key: np.asarray(values) for key, values in (attrs or {}).items()}
+        self._name_index = None
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, dtype=np.int64), np.empty((0, 2)))
+
+    @classmethod
+    def from_points(cls, points):
+        """WasteCollectionPoint/ChargingStation/Location nesnelerinden PointStore oluşturur"""
+        points = list(points)
+        if not points:
+            return cls.empty()
+        ids = [getattr(p, 'id', i + 1) for i, p in enumerate(points)]
+        names = [getattr(p, 'name', '') for p in points]
+        coords = [(p.lat, p.lon) for p in points]
+        attrs = {}
+        if all(hasattr(p, 'period') for p in points):
+            attrs['period'] = [p.period for p in points]
+        return cls(ids, coords, names, attrs)
+
+    def __len__(self):
+        return len(self.coords)
+
+    @property
+    def lat(self):
+        return self.coords[:, 0]
+
+    @property
+    def lon(self):
+        return self.coords[:, 1]
+
+    def coord(self, i) -> Tuple[float, float]:
+        return float(self.coords[i, 0]), float(self.coords[i, 1])
+
+    def name(self, i) -> str:
+        return self.names[i]
+
+    def update(self, i, name, lat, lon):
+        """i. noktanın adını ve koordinatını kopyalamadan yerinde değiştirir"""
+        self.coords[i] = (lat, lon)
+        self.names[i] = name
+        self._name_index = None
+
+    def index_of(self, name) -> int:
+        """İsme göre nokta indeksini döndürür, bulunamazsa -1"""
+        if self._name_index is None:
+            self._name_index = {n: i for i, n in enumerate(self.names)}
+        return self._name_index.get(name, -1)
+
+    @classmethod
+    def concat(cls, stores):
+        """Birden fazla PointStore'u uç uca ekler; yalnızca tüm parçalarda bulunan nitelikler korunur"""
+        stores = [store for store in stores if len(store)]
+        if not stores:
+            return cls.empty()
+        keys = set.intersection(*(set(store.attrs) for store in stores))
+        return cls(np.concatenate([store.ids for store in stores]),
+                   np.concatenate([store.coords for store in stores]),
+                   np.concatenate([store.names for store in stores]),
+                   {key: np.concatenate([store.attrs[key] for store in stores]) for key in keys})
+
+    def subset(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        return PointStore(self.ids[indices], self.coords[indices], self.names[indices],
+                          {key: values[indices] for key, values in self.attrs.items()})
+
+    def point(self, i) -> WasteCollectionPoint:
+        lat, lon = self.coord(i)
+        period = int(self.attrs['period'][i]) if 'period' in self.attrs else WasteCollectionPoint.period
+        return WasteCollectionPoint(id=int(self.ids[i]), name=self.names[i], lat=lat, lon=lon, period=period)
+
+    def station(self, i) -> ChargingStation:
+        lat, lon = self.coord(i)
+        capacity = int(self.attrs['capacity'][i]) if 'capacity' in self.attrs else ChargingStation.capacity
+        return ChargingStation(id=int(self.ids[i]), lat=lat, lon=lon, capacity=capacity)
+
+class PointStoreBuilder:
+    """Satır satır okunan noktaları büyüyen NumPy tamponlarına yazar"""
+
+    def __init__(self, capacity: int = 1024):
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._coords = np.empty((capacity, 2), dtype=np.float64)
+        self._names = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size):
+        if size <= len(self._ids):
+            return
+        capacity = max(size, 2 * len(self._ids))
+        ids = np.empty(capacity, dtype=np.int64)
+        coords = np.empty((capacity, 2), dtype=np.float64)
+        ids[:self._size] = self._ids[:self._size]
+        coords[:self._size] = self._coords[:self._size]
+        self._ids, self._coords = ids, coords
+
+    def extend(self, names, lats, lons):
+        count = len(names)
+        start, end = self._size, self._size + count
+        self._reserve(end)
+        self._ids[start:end] = np.arange(start + 1, end + 1)
+        self._coords[start:end, 0] = lats
+        self._coords[start:end, 1] = lons
+        self._names.extend(names)
+        self._size = end
+
+    def build(self) -> PointStore:
+        return PointStore(self._ids[:self._size].copy(), self._coords[:self._size].copy(), self._names)
+
+@dataclass
+class RowError:
+    row: int  # dosyadaki satır numarası (başlık 1. satır)
+    message: str
+
+def _demand_column_indexes(header, path):
+    header = [str(h).strip() if h is not None else '' for h in header]
+    missing = [col for col in DEMAND_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"'{path}' dosyasında gerekli sütunlar ({', '.join(missing)}) bulunamadı!")
+    return [header.index(col) for col in DEMAND_COLUMNS]
+
+def _iter_xlsx_chunks(path, chunk_size):
+    """openpyxl salt-okunur modunda çalışma sayfasını parça parça okur"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        indexes = _demand_column_indexes(next(rows, ()), path)
+        first_row, columns = 2, ([], [], [])
+        for row_number, row in enumerate(rows, start=2):
+            for values, index in zip(columns, indexes):
+                values.append(row[index] if index < len(row) else None)
+            if len(columns[0]) == chunk_size:
+                yield first_row, columns
+                first_row, columns = row_number + 1, ([], [], [])
+        if columns[0]:
+            yield first_row, columns
+    finally:
+        workbook.close()
+
+def _iter_csv_chunks(path, chunk_size):
+    """CSV dosyasını pandas ile parça parça okur
+
+    Boş satırlar atılmaz ki satır numaraları dosyadaki satırlarla örtüşsün;
+    tamamen boş satırlar load_demand_points içinde sessizce atlanır.
+    """
+    _demand_column_indexes(pd.read_csv(path, nrows=0).columns, path)
+    first_row = 2
+    for chunk in pd.read_csv(path, usecols=list(DEMAND_COLUMNS), dtype=object,
+                             keep_default_na=False, skip_blank_lines=False,
+                             chunksize=chunk_size):
+        yield first_row, tuple(chunk[col].tolist() for col in DEMAND_COLUMNS)
+        first_row += len(chunk)
+
+def load_demand_points(path: str = DEMAND_FILE, chunk_size: int = DEMAND_CHUNK_SIZE) -> Tuple[PointStore, List[RowError]]:
+    """Talep noktalarını xlsx veya csv dosyasından akış halinde PointStore'a yükler.
+
+    Hatalı satırlar yüklemeyi durdurmaz; satır numarasıyla birlikte ikinci dönüş değerinde raporlanır.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' dosyası bulunamadı!")
+    if path.lower().endswith('.csv'):
+        chunks = _iter_csv_chunks(path, chunk_size)
+    else:
+        chunks = _iter_xlsx_chunks(path, chunk_size)
+
+    builder = PointStoreBuilder()
+    errors = []
+    for first_row, (names, xs, ys) in chunks:
+        names = pd.Series(names, dtype=object)
+        blank_names = names.isna() | (names.astype(str).str.strip() == '')
+        lons = pd.to_numeric(pd.Series(xs, dtype=object), errors='coerce').to_numpy(dtype=float)
+        lats = pd.to_numeric(pd.Series(ys, dtype=object), errors='coerce').to_numpy(dtype=float)
+        bad_lon = ~(np.abs(lons) <= 180)
+        bad_lat = ~(np.abs(lats) <= 90)
+        invalid = blank_names.to_numpy() | bad_lon | bad_lat
+        for i in np.flatnonzero(invalid):
+            if blank_names.iloc[i] and xs[i] in (None, '') and ys[i] in (None, ''):
+                continue  # tamamen boş satır
+            if blank_names.iloc[i]:
+                message = "Mahalle adı boş"
+            elif bad_lon[i]:
+                message = f"Geçersiz X (boylam) değeri: {xs[i]!r}"
+            else:
+                message = f"Geçersiz Y (enlem) değeri: {ys[i]!r}"
+            errors.append(RowError(row=first_row + int(i), message=message))
+        valid = ~invalid
+        builder.extend(names[valid].astype(str).str.strip().tolist(), lats[valid], lons[valid])
+    return builder.build(), errors
+
+def _coordinate_keys(coords):
+    return [tuple(row) for row in np.round(np.asarray(coords, dtype=np.float64), 6).tolist()]
+
+class MatrixView:
+    """Global matrisin seçili düğümlere karşılık gelen alt matrisi.
+
+    Alt matris oluşturulmaz; her erişim ``index`` üzerinden doğrudan bellek eşlemeli matrise yönlendirilir.
+    """
+    __slots__ = ('base', 'index')
+
+    def __init__(self, base, index):
+        self.base = base
+        self.index = np.asarray(index, dtype=np.intp)
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.index)
+
+    def __getitem__(self, key):
+        rows, cols = key
+        row_index, col_index = self.index[rows], self.index[cols]
+        # NumPy'daki gibi: dilimler dış çarpım, dizi çiftleri eleman eleman indekslenir
+        if (isinstance(rows, slice) or isinstance(cols, slice)) and np.ndim(row_index) and np.ndim(col_index):
+            return self.base[np.ix_(row_index, col_index)]
+        return self.base[row_index, col_index]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.base[np.ix_(self.index, self.index)], dtype=dtype)
+
+class _SharedBlock(shared_memory.SharedMemory):
+    # NumPy görünümleri doğrudan mmap nesnesine bağlanır; eşleme açıkça kapatılırsa görünümler geçersiz
+    # belleğe işaret eder. Bu yüzden yalnızca dosya tanıtıcısı kapatılır, eşleme son görünümle birlikte kapanır.
+    def __del__(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+class SharedArrays:
+    """Adlandırılmış NumPy dizilerini tek bir ``multiprocessing.shared_memory`` bloğunda yayınlar.
+
+    Tutamaç yalnızca blok adını, dizi düzenini ve küçük ``meta`` verisini taşır; süreçlere gönderilmesi
+    (pickle) dizi boyutundan bağımsızdır. Çalışan süreç ``attach`` ile dizileri kopyalamadan salt okunur
+    görünüm olarak alır. Bloğu oluşturan süreç iş bitince ``close`` çağırır (``with`` bloğuyla otomatik);
+    bellek, bloğa bağlı son görünüm de silinince işletim sistemince serbest bırakılır.
+    """
+
+    def __init__(self, name: str, layout: dict, meta: dict = None):
+        self.name = name
+        self.layout = layout  # dizi adı -> (bayt konumu, dtype, boyut)
+        self.meta = meta or {}
+        self._shm = None
+        self._owner = False
+
+    @classmethod
+    def publish(cls, arrays: dict, **meta) -> 'SharedArrays':
+        """Dizileri yeni bir paylaşımlı bellek bloğuna bir kez kopyalar"""
+        arrays = {key: np.ascontiguousarray(value) for key, value in arrays.items()}
+        layout, size = {}, 0
+        for key, array in arrays.items():
+            size = -(-size // SHARED_ALIGN) * SHARED_ALIGN
+            layout[key] = (size, array.dtype.str, array.shape)
+            size += array.nbytes
+        shm = _SharedBlock(create=True, size=max(size, 1))
+        handle = cls(shm.name, layout, meta)
+        handle._shm, handle._owner = shm, True
+        for key, array in arrays.items():
+            np.ndarray(array.shape, array.dtype, buffer=shm.buf, offset=layout[key][0])[...] = array
+        return handle
+
+    def attach(self) -> dict:
+        """Blok üzerindeki dizilerin salt okunur görünümleri (kopyasız)"""
+        if self._shm is None:
+            try:
+                # Python 3.13+: bloğu yalnızca oluşturan süreç izler ve siler
+                self._shm = _SharedBlock(name=self.name, track=False)
+            except TypeError:
+                self._shm = _SharedBlock(name=self.name)
+        arrays = {}
+        for key, (offset, dtype, shape) in self.layout.items():
+            array = np.ndarray(shape, np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+            array.flags.writeable = False
+            arrays[key] = array
+        return arrays
+
+    def close(self):
+        """Bloğu bu süreçte bırakır, oluşturan süreçte ayrıca siler; eşleme üzerindeki son dizi silinince kapanır"""
+        if self._shm is None:
+            return
+        if self._owner:
+            self._shm.unlink()
+            self._owner = False
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        return {'name': self.name, 'layout': self.layout, 'meta': self.meta}
+
+    def __setstate__(self, state):
+        self.__init__(state['name'], state['layout'], state['meta'])
+
+class DistanceMatrix:
+    """Tüm konumlar ve şarj istasyonları arasındaki yol mesafesi (km) ve süresi (sn) matrisleri.
+
+    Düğüm sırası: önce konumlar, ardından şarj istasyonları. Matrisler ``.npy`` dosyalarından
+    bellek eşlemeli olarak açılır; yalnızca erişilen satırlar diskten okunur. ``estimated`` maskesi,
+    OSRM'ye ulaşılamadığı için kuş uçuşu tahminiyle doldurulan hücreleri işaretler.
+    """
+
+    def __init__(self, distance, duration, coords, n_locations, names=None, estimated=None, created=None):
+        self.distance = distance
+        self.duration = duration
+        self.coords = coords
+        self.n_locations = n_locations
+        self.names = names or []
+        self.estimated = estimated  # None: tüm hücreler yol verisinden
+        self.created = created  # diske kaydedilmiş matrisin oluşturulma zamanı (index.json)
+        self.shared = None  # paylaşımlı bellekten açıldıysa tutamacı
+        self._keys = {}
+
+    @property
+    def n_stations(self):
+        return len(self.coords) - self.n_locations
+
+    @classmethod
+    def open(cls, directory: str = MATRIX_DIR):
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+            index = json.load(f)
+        distance = np.load(os.path.join(directory, 'distance.npy'), mmap_mode='r')
+        duration = np.load(os.path.join(directory, 'duration.npy'), mmap_mode='r')
+        coords = np.load(os.path.join(directory, 'coords.npy'))
+        estimated = None
+        if index.get('estimated_cells'):
+            estimated = np.load(os.path.join(directory, 'estimated.npy'), mmap_mode='r')
+        return cls(distance, duration, coords, index['n_locations'], index.get('names'), estimated,
+                   index.get('created'))
+
+    @classmethod
+    def open_if_exists(cls, directory: str = MATRIX_DIR):
+        """Klasörde kaydedilmiş matris varsa açar, yoksa None döner"""
+        if os.path.exists(os.path.join(directory, 'index.json')):
+            return cls.open(directory)
+        return None
+
+    def share(self) -> SharedArrays:
+        """Mesafe/süre matrislerini ve koordinatları paralel süreçler için paylaşımlı belleğe bir kez yazar"""
+        arrays = {'distance': self.distance, 'duration': self.duration, 'coords': self.coords}
+        if self.estimated is not None:
+            arrays['estimated'] = self.estimated
+        return SharedArrays.publish(arrays, n_locations=self.n_locations, names=list(self.names),
+                                    created=self.created)
+
+    @classmethod
+    def from_shared(cls, handle: SharedArrays) -> 'DistanceMatrix':
+        """``share`` ile yayınlanmış matrise kopyalamadan bağlanır"""
+        arrays = handle.attach()
+        matrix = cls(arrays['distance'], arrays['duration'], arrays['coords'], handle.meta['n_locations'],
+                     handle.meta['names'], arrays.get('estimated'), handle.meta.get('created'))
+        matrix.shared = handle
+        return matrix
+
+    @classmethod
+    def build(cls, directory: str, locations: PointStore, stations: PointStore,
+              block_size: int = OSRM_TABLE_BLOCK, demand_file: str = DEMAND_FILE):
+        """Matrisleri OSRM table servisinden blok blok hesaplayıp doğrudan diske yazar.
+
+        OSRM'ye ulaşılamayan bloklar kuş uçuşu tahminiyle doldurulur; bu hücreler ``estimated.npy``
+        maskesine yazılır ve yol katsayısı kalibrasyonunda kullanılmaz.
+        """
+        os.makedirs(directory, exist_ok=True)
+        coords = np.vstack([locations.coords, stations.coords])
+        n = len(coords)
+        distance = np.lib.format.open_memmap(os.path.join(directory, 'distance.npy'), mode='w+',
+                                             dtype=np.float32, shape=(n, n))
+        duration = np.lib.format.open_memmap(os.path.join(directory, 'duration.npy'), mode='w+',
+                                             dtype=np.float32, shape=(n, n))
+        estimated = np.lib.format.open_memmap(os.path.join(directory, 'estimated.npy'), mode='w+',
+                                              dtype=bool, shape=(n, n))
+        for row in range(0, n, block_size):
+            for col in range(0, n, block_size):
+                block = (slice(row, row + block_size), slice(col, col + block_size))
+                distance[block], duration[block], estimated[block] = get_osrm_table(
+                    coords[block[0]], coords[block[1]], return_estimated=True)
+        estimated_cells = int(np.count_nonzero(estimated))
+        distance.flush()
+        duration.flush()
+        estimated.flush()
+        del distance, duration, estimated
+        if not estimated_cells:
+            os.remove(os.path.join(directory, 'estimated.npy'))
+        else:
+            print(f"Uyarı: {estimated_cells} / {n * n} hücre OSRM'ye ulaşılamadığı için kuş uçuşu tahminiyle "
+                  f"dolduruldu; bu hücreler kalibrasyonda kullanılmayacak")
+
+        np.save(os.path.join(directory, 'coords.npy'), coords)
+        with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'n_locations': len(locations),
+                'n_stations': len(stations),
+                'names': [str(name) for name in locations.names],
+                'demand_file': demand_file,
+                'estimated_cells': estimated_cells,
+                'created': datetime.now().isoformat(timespec='seconds'),
+            }, f, ensure_ascii=False, indent=2)
+        return cls.open(directory)
+
+    def with_stations(self, stations: PointStore, block_size: int = OSRM_TABLE_BLOCK) -> 'DistanceMatrix':
+        """Konumlar arası bloğu bu matristen alıp yalnızca istasyon satır ve sütunlarını yeni yerleşim için
+        hesaplayan bellek içi matris (farklı istasyon yerleşimlerini denemek için)"""
+        n, n_nodes = self.n_locations, self.n_locations + len(stations)
+        coords = np.vstack([self.coords[:n], stations.coords])
+        distance = np.empty((n_nodes, n_nodes), dtype=np.float32)
+        duration = np.empty_like(distance)
+        estimated = np.zeros((n_nodes, n_nodes), dtype=bool)
+        distance[:n, :n] = self.distance[:n, :n]
+        duration[:n, :n] = self.duration[:n, :n]
+        if self.estimated is not None:
+            estimated[:n, :n] = self.estimated[:n, :n]
+        for row in range(0, n_nodes, block_size):
+            rows = slice(row, row + block_size)
+            for col in range(n, n_nodes, block_size):
+                cols = slice(col, col + block_size)
+                distance[rows, cols], duration[rows, cols], estimated[rows, cols] = get_osrm_table(
+                    coords[rows], coords[cols], return_estimated=True)
+                if row < n:
+                    rows_n = slice(row, min(row + block_size, n))
+                    distance[cols, rows_n], duration[cols, rows_n], estimated[cols, rows_n] = get_osrm_table(
+                        coords[cols], coords[rows_n], return_estimated=True)
+        return DistanceMatrix(distance, duration, coords, n, self.names, estimated if estimated.any() else None,
+                              self.created)
+
+    def _node_indexes(self, points: PointStore, start: int, stop: int) -> np.ndarray:
+        # Konum ve istasyon aralıkları ayrı eşlenir; bir istasyon bir konumla aynı yerde olabilir
+        keys = self._keys.get((start, stop))
+        if keys is None:
+            keys = self._keys[(start, stop)] = {
+                key: start + i for i, key in reversed(list(enumerate(_coordinate_keys(self.coords[start:stop]))))}
+        return np.array([keys.get(key, -1) for key in _coordinate_keys(points.coords)], dtype=np.intp)
+
+    def location_indexes(self, points: PointStore) -> np.ndarray:
+        """Noktaların matristeki konum indeksleri; matriste olmayan noktalar için -1"""
+        return self._node_indexes(points, 0, self.n_locations)
+
+    def station_indexes(self, stations: PointStore) -> np.ndarray:
+        return self._node_indexes(stations, self.n_locations, len(self.coords))
+
+    def view(self, node_indexes):
+        return MatrixView(self.distance, node_indexes), MatrixView(self.duration, node_indexes)
+
+class NearestStationTable:
+    """Her konum için en yakın şarj istasyonu, yedek istasyon ve bunlara mesafe (km) / süre (sn).
+
+    İstasyon indeksleri istasyon PointStore'undaki sıraya göredir; yedek yoksa -1. "Bu konumdan hâlâ bir
+    istasyona ulaşılabilir mi" kontrolleri tek dizi okumasıdır.
+    """
+    __slots__ = ('best', 'best_distance', 'best_duration', 'backup', 'backup_distance', 'backup_duration')
+
+    def __init__(self, best, best_distance, best_duration, backup, backup_distance, backup_duration):
+        self.best = best
+        self.best_distance = best_distance
+        self.best_duration = best_duration
+        self.backup = backup
+        self.backup_distance = backup_distance
+        self.backup_duration = backup_duration
+
+    @classmethod
+    def from_matrices(cls, distance, duration):
+        """(konum x istasyon) mesafe ve süre matrislerinden tabloyu oluşturur"""
+        distance = np.asarray(distance, dtype=np.float64)
+        duration = np.asarray(duration, dtype=np.float64)
+        n, n_stations = distance.shape
+        rows = np.arange(n)
+        missing = np.full(n, -1), np.full(n, np.inf), np.full(n, np.inf)
+        if not n_stations:
+            return cls(*missing, *missing)
+        order = np.argsort(distance, axis=1)
+        best = order[:, 0]
+        table = (best, distance[rows, best], duration[rows, best])
+        if n_stations == 1:
+            return cls(*table, *missing)
+        backup = order[:, 1]
+        return cls(*table, backup, distance[rows, backup], duration[rows, backup])
+
+    def __len__(self):
+        return len(self.best)
+
+@dataclass
+class ChargingPlan:
+    feasible: bool
+    cost: float = 0.0  # şarj sapmalarının eklediği mesafe (km)
+    insertions: List[Tuple[int, int]] = field(default_factory=list)  # (ayak indeksi, istasyon düğümü)
+
+def optimal_charging_stops(order, distance, station_nodes, energy=None, start_charge: float = 100.0,
+                           capacity: float = 100.0, reserve: float = CHARGE_RESERVE) -> ChargingPlan:
+    """Sabit ziyaret sırası için en az ek mesafeli şarj duraklarını etiketleme (DP) ile bulur.
+
+    ``order[i] -> order[i + 1]`` ayağına en fazla bir istasyon eklenir; istasyonda batarya ``capacity``
+    değerine kadar doldurulur. Her konumda (maliyet, şarj) etiketlerinden baskın olmayanlar tutulur ve her
+    istasyon için en ucuz uygun etiket ikili aramayla bulunur; matris erişimleri O(n·k)'dır.
+    ``energy`` verilmezse tüketim ``ElectricVehicle.energy_for`` ile mesafeden hesaplanır.
+    """
+    order = np.asarray(order, dtype=np.intp)
+    stations = np.asarray(station_nodes, dtype=np.intp)
+    if len(order) < 2:
+        return ChargingPlan(feasible=True)
+
+    a, b = order[:-1], order[1:]
+    leg_distance = np.asarray(distance[a, b], dtype=np.float64)
+    if energy is None:
+        leg_energy = ElectricVehicle.energy_for(leg_distance)
+    else:
+        leg_energy = np.asarray(energy[a, b], dtype=np.float64)
+
+    # Enerji yeterliyse hiç şarj durağı gerekmez
+    if start_charge - leg_energy.sum() >= reserve:
+        return ChargingPlan(feasible=True)
+    if not len(stations):
+        return ChargingPlan(feasible=False, cost=math.inf)
+
+    to_station = np.asarray(distance[a[:, None], stations[None, :]], dtype=np.float64)
+    from_station = np.asarray(distance[stations[None, :], b[:, None]], dtype=np.float64)
+    if energy is None:
+        to_station_energy = ElectricVehicle.energy_for(to_station)
+        from_station_energy = ElectricVehicle.energy_for(from_station)
+    else:
+        to_station_energy = np.asarray(energy[a[:, None], stations[None, :]], dtype=np.float64)
+        from_station_energy = np.asarray(energy[stations[None, :], b[:, None]], dtype=np.float64)
+    detour = (to_station + from_station - leg_distance[:, None]).tolist()
+    reach = (reserve + to_station_energy).tolist()
+    arrival = (capacity - from_station_energy).tolist()
+    station_ids = stations.tolist()
+    leg_energy = leg_energy.tolist()
+    floor = reserve - 1e-9  # kırpılmış şarjlardaki yuvarlama hatalarına karşı tolerans
+    # Turun kalanını şarjsız bitirmeye yetecek şarjdan fazlası işe yaramaz; etiketler bu sınıra kırpılır
+    # ve böylece eşdeğer etiketler birbirini eler
+    needed = (reserve + np.concatenate([np.cumsum(leg_energy[::-1])[::-1][1:], [0.0]])).tolist()
+
+    # Etiket: (maliyet, şarj, önceki etiket, ayak, istasyon); cephe şarja göre artan sıralı tutulur
+    front = [(0.0, float(start_charge), None, -1, -1)]
+    for leg in range(len(leg_energy)):
+        charges = [label[1] for label in front]
+        energy_used, cap = leg_energy[leg], needed[leg]
+        candidates = [(label[0], min(label[1] - energy_used, cap), label, -1, -1)
+                      for label in front if label[1] - energy_used >= floor]
+        leg_detour, leg_reach, leg_arrival = detour[leg], reach[leg], arrival[leg]
+        for s, station in enumerate(station_ids):
+            if leg_arrival[s] < floor:
+                continue
+            # Bu istasyona ulaşabilen en ucuz etiket: yeterli şarjı olan ilk etiket
+            first = bisect_left(charges, leg_reach[s] - 1e-9)
+            if first < len(front):
+                origin = front[first]
+                candidates.append((origin[0] + leg_detour[s], min(leg_arrival[s], cap), origin, leg, station))
+        if not candidates:
+            return ChargingPlan(feasible=False, cost=math.inf)
+
+        # Baskın olmayan etiketleri seç: şarj azaldıkça maliyet de kesin olarak azalmalı
+        candidates.sort(key=lambda label: (-label[1], label[0]))
+        front = []
+        best_cost = math.inf
+        for label in candidates:
+            if label[0] < best_cost:
+                front.append(label)
+                best_cost = label[0]
+        front.reverse()
+
+    label = front[0]
+    plan = ChargingPlan(feasible=True, cost=float(label[0]))
+    while label is not None:
+        if label[4] >= 0:
+            plan.insertions.append((label[3], label[4]))
+        label = label[2]
+    plan.insertions.reverse()
+    return plan
+
+def nearest_neighbor_tour(distance, nodes, start: int) -> np.ndarray:
+    """Başlangıçtan itibaren her adımda en yakın ziyaret edilmemiş düğüme giden tur"""
+    remaining = list(nodes)
+    tour = []
+    current = start
+    while remaining:
+        nearest = int(np.argmin(distance[current, np.asarray(remaining)]))
+        current = remaining.pop(nearest)
+        tour.append(current)
+    return np.asarray(tour, dtype=np.intp)
+
+def savings_tour(distance, nodes, depot: int) -> np.ndarray:
+    """Clarke-Wright tasarruf algoritmasıyla tek araçlık tur (depo turun başında, dönüş yok)"""
+    nodes = np.asarray(nodes, dtype=np.intp)
+    n = len(nodes)
+    if n < 3:
+        return nodes.copy()
+    d = np.asarray(distance[nodes[:, None], nodes[None, :]], dtype=np.float64)
+    from_depot = np.asarray(distance[depot, nodes], dtype=np.float64)
+    savings = from_depot[:, None] + from_depot[None, :] - d
+    i_idx, j_idx = np.triu_indices(n, k=1)
+    ranked = np.argsort(-savings[i_idx, j_idx], kind='stable')
+
+    # Her düğüm başlangıçta kendi rotasıdır; rotalar uç noktalarından birleştirilir
+    routes = {i: [i] for i in range(n)}
+    route_of = list(range(n))
+    for r in ranked:
+        i, j = int(i_idx[r]), int(j_idx[r])
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj:
+            continue
+        a, b = routes[ri], routes[rj]
+        if a[-1] == i and b[0] == j:
+            merged = a + b
+        elif a[0] == i and b[-1] == j:
+            merged = b + a
+        elif a[-1] == i and b[-1] == j:
+            merged = a + b[::-1]
+        elif a[0] == i and b[0] == j:
+            merged = a[::-1] + b
+        else:
+            continue
+        del routes[rj]
+        routes[ri] = merged
+        for node in b:
+            route_of[node] = ri
+        if len(routes) == 1:
+            break
+
+    tour = next(iter(routes.values()))
+    if from_depot[tour[-1]] < from_depot[tour[0]]:
+        tour.reverse()
+    return nodes[np.asarray(tour, dtype=np.intp)]
+
+def two_opt(distance, tour, max_moves: int = 1000, stop=None) -> np.ndarray:
+    """Başı sabit açık tur için en iyi 2-opt hamlelerini iyileşme kalmayana kadar uygular.
+
+    Yol mesafeleri simetrik olmadığından ters çevrilen bölümün iç maliyeti önek toplamlarıyla hesaplanır.
+    ``stop()`` True dönerse o ana kadar iyileştirilmiş tur döner.
+    """
+    tour = np.asarray(tour, dtype=np.intp).copy()
+    n = len(tour)
+    if n < 4:
+        return tour
+    i, j = np.triu_indices(n, k=1)
+    keep = i >= 1
+    i, j = i[keep], j[keep]
+    for _ in range(max_moves):
+        if stop is not None and stop():
+            break
+        forward = np.asarray(distance[tour[:-1], tour[1:]], dtype=np.float64)
+        backward = np.asarray(distance[tour[1:], tour[:-1]], dtype=np.float64)
+        prefix_forward = np.concatenate([[0.0], np.cumsum(forward)])
+        prefix_backward = np.concatenate([[0.0], np.cumsum(backward)])
+        # tour[i..j] ters çevrilir: giriş/çıkış kenarları ve iç yönü değişir
+        after = np.minimum(j + 1, n - 1)
+        has_next = j + 1 < n
+        old = (forward[i - 1] + prefix_forward[j] - prefix_forward[i]
+               + np.where(has_next, forward[np.minimum(j, n - 2)], 0.0))
+        new = (np.asarray(distance[tour[i - 1], tour[j]], dtype=np.float64)
+               + prefix_backward[j] - prefix_backward[i]
+               + np.where(has_next, np.asarray(distance[tour[i], tour[after]], dtype=np.float64), 0.0))
+        delta = new - old
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9:
+            break
+        tour[i[best]:j[best] + 1] = tour[i[best]:j[best] + 1][::-1]
+    return tour
+
+class GeneticRouteOptimizer:
+    """Başlangıç noktası sabit tek araç turu için genetik algoritma.
+
+    Popülasyon 2-opt ile iyileştirilmiş en yakın komşu, Clarke-Wright ve tarama turları ile bunların
+    rastgele bozulmuş kopyalarıyla başlatılır. En iyi uygunluk ``stagnation_generations`` nesil boyunca iyileşmezse
+    arama erken durur. ``time_budget`` saniye dolduğunda ya da ``stop()`` True döndüğünde (ör. arayüzdeki Durdur)
+    arama, başlangıç popülasyonu kurulurken de, o ana kadarki en iyi turla biter.
+    """
+
+    def __init__(self, distance, n_points: int, station_nodes=(), start_charge: float = 100.0,
+                 energy=None, initial_tours=(), population_size: int = POPULATION_SIZE,
+                 generations: int = NO_GENERATIONS, crossover_rate: float = CROSSOVER_RATE,
+                 mutation_rate: float = MUTATION_RATE, n_mutations: int = NO_OF_MUTATIONS,
+                 keep_best: bool = KEEP_BEST, stagnation_generations: int = STAGNATION_GENERATIONS,
+                 time_budget: float = TIME_BUDGET, seed=None, stop=None):
+        self.distance = np.asarray(distance, dtype=np.float64)
+        self.n_points = n_points
+        self.station_nodes = np.asarray(station_nodes, dtype=np.intp)
+        self.start_charge = start_charge
+        self.energy = None if energy is None else np.asarray(energy, dtype=np.float64)
+        self.initial_tours = [np.asarray(tour, dtype=np.intp) for tour in initial_tours]
+        self.population_size = population_size
+        self.generations = generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.n_mutations = n_mutations
+        self.keep_best = keep_best
+        self.stagnation_generations = stagnation_generations
+        self.time_budget = time_budget
+        self.stop = stop
+        self.rng = np.random.default_rng(seed)
+        self.generations_run = 0
+        self.history: List[Tuple[float, int, float]] = []  # en iyi iyileştikçe (saniye, nesil, maliyet)
+        self._fitness_cache = OrderedDict()
+        self._deadline = None  # time_budget verilmişse iterate içinde ayarlanır (perf_counter zamanı)
+
+    def _stopped(self) -> bool:
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return True
+        return self.stop is not None and self.stop()
+
+    def _seed_candidates(self):
+        nodes = np.arange(1, self.n_points)
+        yield nearest_neighbor_tour(self.distance, nodes, 0)
+        yield savings_tour(self.distance, nodes, 0)
+        yield from self.initial_tours
+
+    def seed_tours(self) -> List[np.ndarray]:
+        """Yapısal sezgisel turlar; her biri 2-opt ile yerel olarak iyileştirilir.
+
+        Arama durdurulursa en az ilk tur (en yakın komşu) döner.
+        """
+        tours = []
+        for tour in self._seed_candidates():
+            if tours and self._stopped():
+                break
+            tours.append(two_opt(self.distance, np.concatenate([[0], tour]), stop=self._stopped)[1:])
+        return tours
+
+    def initial_population(self) -> List[Chromosome]:
+        seeds = self.seed_tours()
+        population = [Chromosome(stops=tour) for tour in seeds]
+        n_seeded = max(len(seeds), int(self.population_size * SEEDED_FRACTION))
+        while len(population) < n_seeded:
+            tour = seeds[len(population) % len(seeds)].copy()
+            for _ in range(self.rng.integers(1, self.n_mutations + 1)):
+                self._invert(tour)
+            population.append(Chromosome(stops=tour))
+        while len(population) < self.population_size:
+            population.append(Chromosome(stops=self.rng.permutation(np.arange(1, self.n_points))))
+        return population[:self.population_size]
+
+    def fitness(self, stops: np.ndarray) -> float:
+        key = stops.tobytes()
+        cached = self._fitness_cache.get(key)
+        if cached is not None:
+            self._fitness_cache.move_to_end(key)
+            return cached
+        order = np.concatenate([[0], stops])
+        cost = float(self.distance[order[:-1], order[1:]].sum())
+        charging = optimal_charging_stops(order, self.distance, self.station_nodes, energy=self.energy,
+                                          start_charge=self.start_charge)
+        cost += charging.cost  # uygulanamayan turlar sonsuz maliyet alır
+        _cache_put(self._fitness_cache, key, cost, FITNESS_CACHE_SIZE)
+        return cost
+
+    def _invert(self, tour):
+        i, j = sorted(self.rng.choice(len(tour) + 1, 2, replace=False))
+        tour[i:j] = tour[i:j][::-1]
+
+    def _mutate(self, tour):
+        for _ in range(self.rng.integers(1, self.n_mutations + 1)):
+            if self.rng.random() < 0.5:
+                self._invert(tour)
+            else:
+                i, j = self.rng.choice(len(tour), 2, replace=False)
+                tour[i], tour[j] = tour[j], tour[i]
+
+    def _ordered_crossover(self, parent1, parent2):
+        i, j = sorted(self.rng.choice(len(parent1) + 1, 2, replace=False))
+        child = np.empty_like(parent1)
+        child[i:j] = parent1[i:j]
+        rest = parent2[~np.isin(parent2, parent1[i:j])]
+        child[:i] = rest[:i]
+        child[j:] = rest[i:]
+        return child
+
+    def _select(self, population):
+        contestants = self.rng.choice(len(population), TOURNAMENT_SIZE, replace=False)
+        return min((population[i] for i in contestants), key=lambda c: c.fitness)
+
+    def iterate(self, report_interval: float = PROGRESS_INTERVAL):
+        """Anytime arama: en iyi tur iyileşmese de her ``report_interval`` saniyede bir SolverProgress üretir.
+
+        Son eleman ``final=True`` taşır. Tüketici döngüden çıkarak ya da ``stop`` ile aramayı istediği an
+        durdurabilir; ``stop`` her nesilde ve başlangıç popülasyonu değerlendirilirken kontrol edilir.
+        """
+        started = time.perf_counter()
+        # Süre sınırı tohum turlarının 2-opt'u ve başlangıç popülasyonunun değerlendirilmesi sırasında da geçerli
+        self._deadline = started + self.time_budget if self.time_budget is not None else None
+        if self.n_points <= 3:
+            tour = nearest_neighbor_tour(self.distance, np.arange(1, self.n_points), 0)
+            yield SolverProgress(0, self.fitness(tour), tour, time.perf_counter() - started, final=True)
+            return
+
+        population = []
+        for chromosome in self.initial_population():
+            if population and self._stopped():
+                break
+            chromosome.fitness = self.fitness(chromosome.stops)
+            population.append(chromosome)
+        best = min(population, key=lambda c: c.fitness)
+        self.history = [(time.perf_counter() - started, 0, best.fitness)]
+        if self._stopped():
+            yield SolverProgress(0, best.fitness, best.stops, time.perf_counter() - started, final=True)
+            return
+        yield SolverProgress(0, best.fitness, best.stops, self.history[0][0])
+        last_report = self.history[0][0]
+        stagnant = 0
+
+        for generation in range(1, self.generations + 1):
+            if self._stopped():
+                break
+            next_population = [Chromosome(stops=best.stops.copy(), fitness=best.fitness)] if self.keep_best else []
+            while len(next_population) < self.population_size:
+                parent1, parent2 = self._select(population), self._select(population)
+                if self.rng.random() < self.crossover_rate:
+                    child = self._ordered_crossover(parent1.stops, parent2.stops)
+                else:
+                    child = parent1.stops.copy()
+                if self.rng.random() < self.mutation_rate:
+                    self._mutate(child)
+                next_population.append(Chromosome(stops=child, fitness=self.fitness(child)))
+            population = next_population
+            self.generations_run = generation
+
+            generation_best = min(population, key=lambda c: c.fitness)
+            if generation_best.fitness < best.fitness - 1e-9:
+                best = generation_best
+                stagnant = 0
+                self.history.append((time.perf_counter() - started, generation, best.fitness))
+            else:
+                stagnant += 1
+            elapsed = time.perf_counter() - started
+            if stagnant >= self.stagnation_generations:
+                break
+            if elapsed - last_report >= report_interval:
+                yield SolverProgress(generation, best.fitness, best.stops, elapsed)
+                last_report = elapsed
+        yield SolverProgress(self.generations_run, best.fitness, best.stops, time.perf_counter() - started, final=True)
+
+    def run(self) -> Chromosome:
+        for progress in self.iterate(math.inf):
+            pass
+        return Chromosome(stops=progress.stops, fitness=progress.cost)
+
+def place_charging_stations(locations: PointStore, n_stations: int = 3, seed=RANDOM_SEED,
+                            method: str = 'kmeans') -> PointStore:
+    """Şarj istasyonlarını yerleştirir.
+
+    ``kmeans``: küme merkezleri; ``medoid``: küme merkezlerine en yakın konumlar (istasyon mevcut bir
+    mahallede); ``farthest``: merkeze en yakın konumdan başlayıp her adımda seçilenlere en uzak konum.
+    """
+    if not len(locations):
+        return PointStore.empty()
+    n_stations = min(n_stations, len(locations))
+
+    if method == 'farthest':
+        coords = locations.coords
+        chosen = [int(np.argmin(straight_line_distance(coords[:, 0], coords[:, 1], *coords.mean(axis=0))))]
+        nearest = straight_line_distance(coords[:, 0], coords[:, 1], *coords[chosen[0]])
+        while len(chosen) < n_stations:
+            chosen.append(int(np.argmax(nearest)))
+            nearest = np.minimum(nearest, straight_line_distance(coords[:, 0], coords[:, 1], *coords[chosen[-1]]))
+        centres = coords[chosen]
+    elif method in ('kmeans', 'medoid'):
+        # K-means ile küme oluştur (koordinat dizisi kopyalanmadan kullanılır)
+        kmeans = KMeans(n_clusters=n_stations, random_state=seed)
+        kmeans.fit(locations.coords)
+        centres = kmeans.cluster_centers_
+        if method == 'medoid':
+            # Her kümenin merkezine en yakın konumu istasyon yap
+            medoids = []
+            for cluster, centre in enumerate(centres):
+                members = np.flatnonzero(kmeans.labels_ == cluster)
+                gap = straight_line_distance(locations.lat[members], locations.lon[members], *centre)
+                medoids.append(members[np.argmin(gap)])
+            centres = locations.coords[medoids]
+    else:
+        raise ValueError(f"Bilinmeyen yerleştirme yöntemi: {method} (geçerli: {', '.join(STATION_PLACEMENT_METHODS)})")
+
+    # Seçilen noktaları şarj istasyonu olarak kullan
+    n_stations = len(centres)
+    return PointStore(
+        ids=np.arange(1, n_stations + 1),
+        coords=centres,
+        attrs={'capacity': np.full(n_stations, ChargingStation.capacity)}
+    )
+
+class RouteGeometry:
+    """Rota geometrisi: tüm ayakların (enlem, boylam) noktaları tek bir (N, 2) float64 dizisinde.
+
+    ``offsets[i]:offsets[i + 1]`` aralığı i. ayağın noktalarıdır.
+    """
+    __slots__ = ('coords', 'offsets')
+
+    def __init__(self, coords, offsets):
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_legs(cls, legs):
+        """Ayak dizilerini tek kopyayla birleştirir"""
+        legs = [np.asarray(leg, dtype=np.float64).reshape(-1, 2) for leg in legs]
+        offsets = np.zeros(len(legs) + 1, dtype=np.int64)
+        np.cumsum([len(leg) for leg in legs], out=offsets[1:])
+        coords = np.concatenate(legs) if legs else np.empty((0, 2))
+        return cls(coords, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def leg(self, i) -> np.ndarray:
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+@dataclass
+class RoutePlan:
+    sequence: List[int]  # ziyaret edilen düğümler; len(noktalar) ve üzeri indeksler şarj istasyonudur
+    distance: float = 0.0  # km
+    duration: float = 0.0  # saniye
+    leg_distances: List[float] = field(default_factory=list)  # ardışık düğümler arası km
+
+class SolutionCache:
+    """Hesaplanmış rotaları ve çizilmiş haritalarını diskte LRU düzeninde saklar"""
+
+    def __init__(self, directory: str = SOLUTION_CACHE_DIR, max_entries: int = SOLUTION_CACHE_SIZE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._index_path = os.path.join(directory, 'index.json')
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self._index_path, encoding='utf-8') as f:
+                self._entries = OrderedDict((key, None) for key in json.load(f))
+        except (OSError, ValueError):
+            self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(points: PointStore, stations: PointStore, vehicle: ElectricVehicle, settings: dict) -> str:
+        """Nokta kümesi, araç parametreleri, istasyon yerleşimi ve çözücü ayarlarının kanonik özeti"""
+        vehicle_params = asdict(vehicle)
+        vehicle_params.pop('id', None)
+        payload = {
+            'points': list(zip((str(name) for name in points.names), _coordinate_keys(points.coords))),
+            'stations': _coordinate_keys(stations.coords),
+            'vehicle': vehicle_params,
+            'settings': settings,
+        }
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.html")
+
+    def _save_index(self):
+        with open(self._index_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._entries), f)
+
+    def get(self, key: str):
+        """Önbellekte varsa (RoutePlan, harita yolu) döndürür"""
+        if key not in self._entries:
+            return None
+        plan_path, map_path = self._paths(key)
+        try:
+            with open(plan_path, encoding='utf-8') as f:
+                plan = RoutePlan(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            self._entries.pop(key)
+            self._save_index()
+            return None
+        self._entries.move_to_end(key)
+        self._save_index()
+        return plan, (map_path if os.path.exists(map_path) else None)
+
+    def put(self, key: str, plan: RoutePlan, map_path: str = None) -> str:
+        """Çözümü saklar ve haritanın önbellekteki kopyasının yolunu döndürür"""
+        plan_path, cached_map_path = self._paths(key)
+        with open(plan_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(plan), f)
+        if map_path:
+            shutil.copyfile(map_path, cached_map_path)
+        self._entries[key] = None
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            for path in self._paths(old_key):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._save_index()
+        return cached_map_path if map_path else None
+
+class RoutePlanner:
+    """Konumları, şarj istasyonlarını ve mesafe matrisini tutarak arayüzden bağımsız rota hesaplar"""
+
+    def __init__(self, locations: PointStore, charging_stations: PointStore = None,
+                 matrix: DistanceMatrix = None, cache: SolutionCache = None, seed=RANDOM_SEED,
+                 vehicle_type: VehicleType = None, payload_t: float = None):
+        self.locations = locations
+        self.vehicle_type = vehicle_type if vehicle_type is not None else VEHICLE_TYPES[DEFAULT_VEHICLE_TYPE]
+        self.payload_t = payload_t  # taşınan yük (ton); None: tam yük (en kötü durum)
+        self.seed = seed  # GA tohumu; aynı tohum ve girdiyle aynı rota üretilir
+        self.charging_stations = (charging_stations if charging_stations is not None
+                                  else place_charging_stations(locations))
+        self.matrix = matrix
+        self.cache = cache
+        self._station_table = None
+        if matrix is not None:
+            road_estimator.calibrate_from_matrix(matrix)
+
+    @classmethod
+    def for_worker(cls, locations: PointStore, stations: PointStore, shared_matrix: SharedArrays = None,
+                   osm_graph: str = None, **kwargs) -> 'RoutePlanner':
+        """Paralel çözücü sürecinin planlayıcısı: rota motorunu ayarlar ve paylaşımlı matrise kopyalamadan bağlanır"""
+        use_osm_graph(osm_graph)
+        matrix = DistanceMatrix.from_shared(shared_matrix) if shared_matrix is not None else None
+        return cls(locations, stations, matrix=matrix, **kwargs)
+
+    @property
+    def station_table(self) -> NearestStationTable:
+        """Tüm konumlar için en yakın/yedek istasyon tablosu; ilk erişimde bir kez hesaplanır.
+
+        Konumlar ve istasyonlar kayıtlı matristeyse tablo ondan okunur, değilse bloklu table istekleriyle
+        hesaplanır.
+        """
+        if self._station_table is None:
+            stations = self.charging_stations
+            if self.matrix is not None:
+                location_index = self.matrix.location_indexes(self.locations)
+                station_index = self.matrix.station_indexes(stations)
+                if (location_index >= 0).all() and (station_index >= 0).all():
+                    cells = np.ix_(location_index, station_index)
+                    self._station_table = NearestStationTable.from_matrices(
+                        self.matrix.distance[cells], self.matrix.duration[cells])
+                    return self._station_table
+            self._station_table = NearestStationTable.from_matrices(
+                *get_osrm_table_blocked(self.locations.coords, stations.coords))
+        return self._station_table
+
+    def settings(self) -> dict:
+        """Çözüm sonucunu etkileyen çözücü ayarları (önbellek anahtarı için)"""
+        return {
+            'optimizer': 'ga', 'generations': NO_GENERATIONS, 'population': POPULATION_SIZE,
+            'crossover': CROSSOVER_RATE, 'mutation': MUTATION_RATE, 'mutations': NO_OF_MUTATIONS,
+            'keep_best': KEEP_BEST, 'stagnation': STAGNATION_GENERATIONS, 'time_budget': TIME_BUDGET,
+            'policy': 'dp-charging', 'reserve': CHARGE_RESERVE, 'routing': routing_identity(),
+            'matrix': ({'created': self.matrix.created, 'nodes': len(self.matrix.coords)}
+                       if self.matrix is not None else None),
+            'seed': self.seed, 'vehicle_type': asdict(self.vehicle_type), 'payload_t': self.payload_t,
+        }
+
+    def solve(self, points: PointStore, map_path: str = 'waste_collection_route.html', on_progress=None,
+              stop=None):
+        """Rotayı hesaplayıp haritasını çizer; aynı istek önbellekteyse saklanan sonucu döndürür.
+
+        ``on_progress`` ya da ``stop`` ile erken durdurulan çözümler önbelleğe yazılmaz.
+        """
+        key = None
+        if self.cache is not None:
+            key = SolutionCache.make_key(points, self.charging_stations, self.vehicle_type.vehicle(1, self.payload_t),
+                                         self.settings())
+            cached = self.cache.get(key)
+            if cached is not None and cached[1] is not None:
+                return cached
+
+        stopped = []
+
+        def report(progress, plan):
+            if on_progress(progress, plan) and not progress.final:
+                stopped.append(progress)
+                return True
+            return False
+
+        plan = self.plan_route(points, on_progress=report if on_progress is not None else None, stop=stop)
+        path = self.render_route(points, plan, map_path)
+        if key is not None and not stopped and not (stop is not None and stop()):
+            path = self.cache.put(key, plan, path)
+        return plan, path
+
+    def node_coords(self, points: PointStore) -> np.ndarray:
+        return np.vstack([points.coords, self.charging_stations.coords])
+
+    def route_matrices(self, points: PointStore):
+        """Noktalar + istasyonlar için (mesafe, süre) matrisleri.
+
+        Tüm düğümler önceden hesaplanmış matriste varsa kopyasız görünüm döner, yoksa matris
+        ``OSRM_TABLE_BLOCK`` boyutlu table istekleriyle hesaplanır.
+        """
+        if self.matrix is not None:
+            index = np.concatenate([self.matrix.location_indexes(points),
+                                    self.matrix.station_indexes(self.charging_stations)])
+            if (index >= 0).all():
+                return self.matrix.view(index)
+        nodes = self.node_coords(points)
+        return get_osrm_table_blocked(nodes, nodes)
+
+    def station_nodes(self, points: PointStore) -> np.ndarray:
+        return np.arange(len(points), len(points) + len(self.charging_stations))
+
+    def iter_plans(self, points: PointStore, vehicle_type: VehicleType = None, time_budget: float = TIME_BUDGET,
+                   report_interval: float = PROGRESS_INTERVAL, stop=None):
+        """Anytime çözüm: arama sürerken (SolverProgress, RoutePlan) çiftleriyle o ana kadarki en iyi rotayı üretir.
+
+        Son çiftin ``progress.final`` değeri True'dur; döngüden çıkmak ya da ``stop()`` ile True döndürmek
+        aramayı durdurur. Şarj planı uygulanamayan ara sonuçlar atlanır; son sonuç da uygulanamazsa
+        ValueError yükseltilir.
+        """
+        vehicle_type = vehicle_type if vehicle_type is not None else self.vehicle_type
+        distance, duration = self.route_matrices(points)
+        n_points = len(points)
+        station_nodes = self.station_nodes(points)
+        vehicle = vehicle_type.vehicle(1, self.payload_t)
+        # Enerji maliyetleri çözüm başına bir kez hesaplanır; GA ve şarj planı yalnızca dizi okur
+        energy = vehicle_type.energy_matrix(distance, self.payload_t)
+
+        # Başlangıç noktası sabit; popülasyon tarama, en yakın komşu ve tasarruf turlarıyla tohumlanır
+        optimizer = GeneticRouteOptimizer(
+            distance, n_points, station_nodes, start_charge=vehicle.current_charge_percentage, energy=energy,
+            initial_tours=[1 + sweep_order(points.coords[1:], points.coord(0))], time_budget=time_budget,
+            seed=self.seed, stop=stop
+        )
+        for progress in optimizer.iterate(report_interval):
+            order = np.concatenate([[0], progress.stops]).astype(np.intp)
+
+            # Şarj duraklarını seçilen sıra üzerinde en az ek mesafeyle yerleştir
+            charging = optimal_charging_stops(order, distance, station_nodes, energy=energy,
+                                              start_charge=vehicle.current_charge_percentage)
+            if not charging.feasible:
+                if progress.final:
+                    raise ValueError("Rota, mevcut şarj istasyonlarıyla batarya bitmeden tamamlanamıyor")
+                continue
+            yield progress, self.build_plan(order, charging, distance, duration)
+
+    def plan_route(self, points: PointStore, vehicle_type: VehicleType = None, on_progress=None,
+                   time_budget: float = TIME_BUDGET, stop=None) -> RoutePlan:
+        """En iyi rotayı hesaplar.
+
+        ``on_progress(progress, plan)`` verilirse her ara sonuçta çağrılır; True dönerse arama durur ve o
+        ana kadarki en iyi rota döner. ``stop()`` her nesilde ve başlangıç popülasyonu kurulurken
+        kontrol edilir; ilerleme bildirimini beklemeden aramayı durdurur.
+        """
+        for progress, plan in self.iter_plans(points, vehicle_type, time_budget,
+                                              PROGRESS_INTERVAL if on_progress is not None else math.inf, stop):
+            if on_progress is not None and on_progress(progress, plan):
+                break
+        return plan
+
+    def fleet_feasibility(self, points: PointStore, order, vehicle_types=None) -> dict:
+        """Verilen ziyaret sırasını her araç tipinin şarj planıyla dener: tip adı -> ChargingPlan.
+
+        Her tipin enerji matrisi planlayıcının yüküyle (``payload_t``) mesafe matrisinden bir kez türetilir;
+        kontroller dizi okumasıdır.
+        """
+        vehicle_types = list(vehicle_types) if vehicle_types is not None else list(VEHICLE_TYPES.values())
+        distance, _ = self.route_matrices(points)
+        distance = np.asarray(distance, dtype=np.float64)
+        station_nodes = self.station_nodes(points)
+        return {vehicle_type.name: optimal_charging_stops(order, distance, station_nodes,
+                                                          energy=vehicle_type.energy_matrix(distance, self.payload_t))
+                for vehicle_type in vehicle_types}
+
+    @staticmethod
+    def build_plan(order, charging: ChargingPlan, distance, duration) -> RoutePlan:
+        """Ziyaret sırası ve şarj eklemelerinden düğüm dizisini ve toplam mesafe/süreyi oluşturur"""
+        stops = dict(charging.insertions)
+        sequence = [int(order[0])]
+        for leg, next_node in enumerate(order[1:]):
+            if leg in stops:
+                sequence.append(stops[leg])
+            sequence.append(int(next_node))
+        nodes = np.asarray(sequence, dtype=np.intp)
+        legs = np.asarray(distance[nodes[:-1], nodes[1:]], dtype=np.float64)
+        return RoutePlan(sequence=sequence,
+                         distance=float(legs.sum()),
+                         duration=float(np.sum(duration[nodes[:-1], nodes[1:]])),
+                         leg_distances=legs.tolist())
+
+    def route_geometry(self, points: PointStore, plan: RoutePlan) -> RouteGeometry:
+        """Plandaki tüm ayakların yol geometrisi; ayaklar tek bir koordinat dizisinde birleştirilir"""
+        nodes = self.node_coords(points)
+        return RouteGeometry.from_legs(get_osrm_route_geometry(*nodes[a], *nodes[b])
+                                       for a, b in zip(plan.sequence, plan.sequence[1:]))
+
+    def stop_rows(self, points: PointStore, plan: RoutePlan):
+        n_points = len(points)
+        cumulative = np.concatenate([[0.0], np.cumsum(plan.leg_distances)])
+        for order, node in enumerate(plan.sequence):
+            if node < n_points:
+                kind, point_id, name, (lat, lon) = 'toplama', int(points.ids[node]), points.name(node), points.coord(node)
+            else:
+                station = node - n_points
+                kind, point_id, name = 'sarj', int(self.charging_stations.ids[station]), f'Şarj İstasyonu {self.charging_stations.ids[station]}'
+                lat, lon = self.charging_stations.coord(station)
+            yield order + 1, kind, point_id, name, lat, lon, float(cumulative[order])
+
+    def export_route(self, points: PointStore, plan: RoutePlan, path: str, fmt: str) -> str:
+        """Rotayı folium kullanmadan GeoJSON, sıkıştırılmış ikili (npz) ya da CSV durak listesi olarak yazar"""
+        if fmt == 'csv':
+            # Durak listesi yol geometrisi gerektirmez; ek rota sorgusu yapılmaz
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['sira', 'tur', 'id', 'ad', 'enlem', 'boylam', 'mesafe_km'])
+                writer.writerows(self.stop_rows(points, plan))
+        elif fmt == 'geojson':
+            geometry = self.route_geometry(points, plan)
+            features = [{
+                'type': 'Feature',
+                'geometry': {'type': 'LineString', 'coordinates': geometry.coords[:, ::-1].tolist()},
+                'properties': {'distance_km': plan.distance, 'duration_s': plan.duration},
+            }]
+            for order, kind, point_id, name, lat, lon, km in self.stop_rows(points, plan):
+                features.append({
+                    'type': 'Feature',
+                    'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+                    'properties': {'sira': order, 'tur': kind, 'id': point_id, 'ad': name, 'mesafe_km': km},
+                })
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'type': 'FeatureCollection', 'features': features}, f, ensure_ascii=False)
+        elif fmt == 'npz':
+            geometry = self.route_geometry(points, plan)
+            np.savez_compressed(path, geometry=np.round(geometry.coords * COORD_SCALE).astype(np.int32),
+                                offsets=geometry.offsets, sequence=np.asarray(plan.sequence, dtype=np.int32),
+                                stops=np.round(self.node_coords(points) * COORD_SCALE).astype(np.int32),
+                                n_points=len(points), coord_scale=COORD_SCALE,
+                                distance_km=plan.distance, duration_s=plan.duration)
+        else:
+            raise ValueError(f"Bilinmeyen dışa aktarma biçimi: {fmt} (geçerli: {', '.join(EXPORT_FORMATS)})")
+        return path
+
+    def render_route(self, points: PointStore, plan: RoutePlan, path: str = 'waste_collection_route.html') -> str:
+        # folium yalnızca HTML harita istendiğinde yüklenir
+        import folium
+        from folium import plugins
+
+        stations = self.charging_stations
+        m = folium.Map(location=list(points.coord(0)), zoom_start=12)
+
+        # Atık toplama noktalarını işaretle
+        for i in range(len(points)):
+            folium.Marker(
+                list(points.coord(i)),
+                popup=f'Atık Toplama Noktası: {points.name(i)}',
+                icon=folium.Icon(color='blue', icon='trash', prefix='fa')
+            ).add_to(m)
+
+        # Şarj istasyonlarını işaretle
+        for s in range(len(stations)):
+            folium.Marker(
+                list(stations.coord(s)),
+                popup=f'Şarj İstasyonu {stations.ids[s]}',
+                icon=folium.Icon(color='green', icon='bolt', prefix='fa')
+            ).add_to(m)
+
+        # Ardışık düğümler arasındaki yol geometrileri tek dizide; listeye yalnızca çizimde çevrilir
+        geometry = self.route_geometry(points, plan)
+
+        # AntPath ile rotayı çiz
+        plugins.AntPath(
+            locations=geometry.coords.tolist(),
+            color='red',
+            weight=5,
+            opacity=0.8,
+            delay=1000,
+            dash_array=[10, 20],
+            pulse_color='#FFFFFF'
+        ).add_to(m)
+
+        m.save(path)
+        return path
 
 class WasteCollectionFrame(tk.Frame):
+    """Tek bir atık toplama noktasını düzenleyen panel.
+
+    Listedeki her nokta için ayrı widget oluşturulmaz; seçilen satır bu panele yüklenir.
+    """
+
     def __init__(self, parent, point_id, locations=None, on_delete=None):
         super().__init__(parent, bd=1, relief=tk.GROOVE, padx=5, pady=5)
         self.point_id = point_id
-        self.locations = locations or []
+        self.locations = locations if locations is not None else PointStore.empty()
         self.on_delete = on_delete
 
         # Frame başlığı ve silme butonu için üst frame
         top_frame = tk.Frame(self)
         top_frame.pack(fill='x', expand=True)
         
-        tk.Label(top_frame, text=f"Atık Toplama Noktası {point_id}:", font=("Arial", 10, "bold")).pack(side=tk.LEFT)
+        self.title_label = tk.Label(top_frame, font=("Arial", 10, "bold"))
+        self.title_label.pack(side=tk.LEFT)
+        self.set_point_id(point_id)
         
         if on_delete:
             delete_btn = tk.Button(top_frame, text="Sil", fg="red", command=self._on_delete)
@@ -87,10 +1484,12 @@ class WasteCollectionFrame(tk.Frame):
         input_frame = tk.Frame(self)
         input_frame.pack(fill='x', expand=True, pady=(5, 0))
         
-        # Atık toplama noktası için combobox
+        # Atık toplama noktası için combobox (tüm mahalleler tek bir widget içinde)
         tk.Label(input_frame, text="Konum:").grid(row=0, column=0, sticky="w", padx=2)
         self.location_var = tk.StringVar()
-        self.location_combo = tk.OptionMenu(input_frame, self.location_var, *[loc.name for loc in self.locations], command=self.update_coords)
+        self.location_combo = ttk.Combobox(input_frame, textvariable=self.location_var,
+                                           values=list(self.locations.names))
+        self.location_combo.bind('<<ComboboxSelected>>', lambda event: self.update_coords(self.location_var.get()))
         self.location_combo.grid(row=0, column=1, sticky="ew", padx=2)
         
         # Koordinat girişleri
@@ -109,14 +1508,25 @@ class WasteCollectionFrame(tk.Frame):
         if self.on_delete:
             self.on_delete(self)
 
+    def set_point_id(self, point_id):
+        self.point_id = point_id
+        self.title_label.config(text=f"Atık Toplama Noktası {point_id}:")
+
+    def _set_coords(self, lat, lon):
+        self.lat_entry.delete(0, tk.END)
+        self.lat_entry.insert(0, str(lat))
+        self.lon_entry.delete(0, tk.END)
+        self.lon_entry.insert(0, str(lon))
+
     def update_coords(self, selection):
-        for loc in self.locations:
-            if loc.name == selection:
-                self.lat_entry.delete(0, tk.END)
-                self.lat_entry.insert(0, str(loc.lat))
-                self.lon_entry.delete(0, tk.END)
-                self.lon_entry.insert(0, str(loc.lon))
-                break
+        index = self.locations.index_of(selection)
+        if index >= 0:
+            self._set_coords(*self.locations.coord(index))
+
+    def set_point_data(self, point: WasteCollectionPoint):
+        self.set_point_id(point.id)
+        self.location_var.set(point.name)
+        self._set_coords(point.lat, point.lon)
 
     def get_point_data(self):
         try:
@@ -130,9 +1540,10 @@ class WasteCollectionFrame(tk.Frame):
             raise ValueError(f"Atık toplama noktası {self.point_id} için geçersiz koordinat değerleri")
 
 class EVRoutingSolverApp(tk.Frame):
-    def __init__(self, root):
+    def __init__(self, root, demand_path: str = DEMAND_FILE, matrix_dir: str = MATRIX_DIR):
         super().__init__(root)
         self.root = root
+        self.demand_path = demand_path
         self.root.title("Elektrikli Atık Toplama Aracı Rotalama Sistemi")
         self.root.geometry("800x600")  # Başlangıç pencere boyutu
         
@@ -142,6 +1553,14 @@ class EVRoutingSolverApp(tk.Frame):
         # Şarj istasyonlarını otomatik yerleştir
         self.charging_stations = self.place_charging_stations()
 
+        # Önceden hesaplanmış mesafe matrisi varsa kullan
+        self.planner = RoutePlanner(self.locations, self.charging_stations,
+                                    matrix=self.load_distance_matrix(matrix_dir),
+                                    cache=SolutionCache())
+
+        # Atık toplama noktaları sütun bazlı olarak tutulur; liste yalnızca görünen satırları çizer
+        self.collection_points = PointStore.empty()
+
         # Main container
         self.main_frame = tk.Frame(root)
         self.main_frame.pack(padx=10, pady=10, fill='both', expand=True)
@@ -153,254 +1572,266 @@ class EVRoutingSolverApp(tk.Frame):
         tk.Button(self.button_frame, text="Atık Toplama Noktası Ekle",
                   command=self.add_collection_point,
                   bg="#4CAF50", fg="white", padx=10).pack(side='left', padx=5)
-        tk.Button(self.button_frame, text="Rota Hesapla",
-                  command=self.solve_routing,
-                  bg="#2196F3", fg="white", padx=10).pack(side='left', padx=5)
+        tk.Button(self.button_frame, text="Seçili Noktayı Güncelle",
+                  command=self.update_collection_point, padx=10).pack(side='left', padx=5)
+        tk.Button(self.button_frame, text="Dosyadan İçe Aktar",
+                  command=self.import_collection_points, padx=10).pack(side='left', padx=5)
+        self.solve_button = tk.Button(self.button_frame, text="Rota Hesapla",
+                                      command=self.solve_routing,
+                                      bg="#2196F3", fg="white", padx=10)
+        self.solve_button.pack(side='left', padx=5)
+        self.stop_button = tk.Button(self.button_frame, text="Durdur", command=self.stop_routing,
+                                     state=tk.DISABLED, padx=10)
+        self.stop_button.pack(side='left', padx=5)
+
+        # Çözüm arka planda çalışır; ara sonuçlar kuyruk üzerinden arayüze aktarılır
+        self.status_var = tk.StringVar()
+        tk.Label(self.main_frame, textvariable=self.status_var, anchor='w').pack(fill='x')
+        self._solver_thread = None
+        self._stop_event = threading.Event()
+        self._progress_queue = queue.Queue()
+
+        # Nokta düzenleme paneli (tüm satırlar için tek panel kullanılır)
+        self.editor = WasteCollectionFrame(self.main_frame, 1, self.locations,
+                                           on_delete=self.delete_collection_point)
+        self.editor.pack(fill='x', pady=5)
 
         # Atık toplama noktaları için başlık
-        tk.Label(self.main_frame, text="Atık Toplama Noktaları", 
-                 font=("Arial", 12, "bold")).pack(anchor="w", pady=(10, 5))
+        self.list_title = tk.Label(self.main_frame, text="Atık Toplama Noktaları",
+                                   font=("Arial", 12, "bold"))
+        self.list_title.pack(anchor="w", pady=(10, 5))
 
-        # Atık toplama noktaları için frame ve scrollbar container
+        # Atık toplama noktaları için liste ve scrollbar container
         self.scroll_container = tk.Frame(self.main_frame)
         self.scroll_container.pack(fill='both', expand=True, pady=5)
-        
-        # Atık toplama noktaları için canvas ve scrollbar oluştur
-        self.canvas = tk.Canvas(self.scroll_container)
-        self.scrollbar = ttk.Scrollbar(self.scroll_container, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
+
+        columns = ('id', 'name', 'lat', 'lon')
+        self.point_list = ttk.Treeview(self.scroll_container, columns=columns, show='headings', selectmode='extended')
+        for column, heading, width in zip(columns, ("No", "Konum", "Enlem", "Boylam"), (60, 300, 150, 150)):
+            self.point_list.heading(column, text=heading)
+            self.point_list.column(column, width=width, anchor='w', stretch=(column == 'name'))
+        self.scrollbar = ttk.Scrollbar(self.scroll_container, orient="vertical", command=self.point_list.yview)
+        self.point_list.configure(yscrollcommand=self.scrollbar.set)
+
         self.scrollbar.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True)
-        
-        # Canvas içinde frame oluştur
-        self.collection_points_frame = tk.Frame(self.canvas)
-        self.canvas_frame = self.canvas.create_window((0, 0), window=self.collection_points_frame, anchor="nw")
-        
-        # Canvas yeniden boyutlandırıldığında frame genişliğini güncelle
-        self.canvas.bind('<Configure>', self.on_canvas_configure)
-        # Frame içeriği değiştiğinde scrollbar'ı güncelle
-        self.collection_points_frame.bind('<Configure>', self.on_frame_configure)
-        
-        self.collection_point_frames = []
-        
-        # İlk atık toplama noktasını otomatik ekle
-        self.add_collection_point()
-        
-        # Mouse tekerleği ile scroll desteği (platform bağımsız)
-        # Windows için
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel_windows)
-        # macOS için
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel_linux)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel_linux)
-        # Trackpad için
-        self.canvas.bind_all("<Control-MouseWheel>", self._on_trackpad)
-
-    def _on_mousewheel_windows(self, event):
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-    
-    def _on_mousewheel_linux(self, event):
-        if event.num == 4:
-            self.canvas.yview_scroll(-1, "units")
-        elif event.num == 5:
-            self.canvas.yview_scroll(1, "units")
-    
-    def _on_trackpad(self, event):
-        self.canvas.yview_scroll(int(-1*(event.delta)), "units")
-
-    def on_canvas_configure(self, event):
-        # Canvas genişliğine göre içerideki frame'i ayarla
-        self.canvas.itemconfig(self.canvas_frame, width=event.width)
-    
-    def on_frame_configure(self, event):
-        # Frame boyutu değiştiğinde scrollbar'ı güncelle
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def delete_collection_point(self, point_frame):
-        # Noktayı listeden ve GUI'den kaldır
-        if point_frame in self.collection_point_frames:
-            self.collection_point_frames.remove(point_frame)
-            point_frame.destroy()
-            
-            # Kalan noktaların ID'lerini yeniden numaralandır
-            for i, frame in enumerate(self.collection_point_frames):
-                frame.point_id = i + 1
-            
-            # Scrollbar'ı güncelle
-            self.collection_points_frame.update_idletasks()
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.point_list.pack(side="left", fill="both", expand=True)
+        self.point_list.bind('<<TreeviewSelect>>', self.on_point_selected)
+        self.point_list.bind('<Delete>', lambda event: self.delete_collection_point(self.editor))
+
+    def set_collection_points(self, points: PointStore):
+        """Nokta listesini tümüyle değiştirir; numaralar 1'den başlayarak yeniden verilir"""
+        self.point_list.delete(*self.point_list.get_children())
+        self.collection_points = PointStore.empty()
+        self.append_collection_points(points)
+
+    def append_collection_points(self, points: PointStore):
+        """Noktaları listenin sonuna ekler; ağaca yalnızca yeni satırlar eklenir"""
+        start = len(self.collection_points)
+        points = PointStore.concat([self.collection_points, points])
+        points.ids = np.arange(1, len(points) + 1)
+        self.collection_points = points
+        for i in range(start, len(points)):
+            self.point_list.insert('', 'end', values=self._row_values(i))
+        self._update_count()
+
+    def _row_values(self, i):
+        lat, lon = self.collection_points.coord(i)
+        return i + 1, self.collection_points.name(i), f"{lat:.6f}", f"{lon:.6f}"
+
+    def _update_count(self):
+        self.list_title.config(text=f"Atık Toplama Noktaları ({len(self.collection_points)})")
+        self.editor.set_point_id(len(self.collection_points) + 1)
+
+    def _selected_rows(self):
+        # Satır kimlikleri sabittir; nokta indeksi satırın ağaçtaki sırasıdır
+        return sorted(self.point_list.index(iid) for iid in self.point_list.selection())
+
+    def on_point_selected(self, event=None):
+        rows = self._selected_rows()
+        if len(rows) == 1:
+            self.editor.set_point_data(self.collection_points.point(rows[0]))
+
+    def delete_collection_point(self, point_frame=None):
+        # Seçili noktaları listeden kaldır ve kalanları yeniden numaralandır
+        rows = self._selected_rows()
+        if rows:
+            keep = np.delete(np.arange(len(self.collection_points)), rows)
+            points = self.collection_points.subset(keep)
+            points.ids = np.arange(1, len(points) + 1)
+            self.collection_points = points
+            self.point_list.delete(*self.point_list.selection())
+            # Yalnızca silinen ilk satırdan sonraki satırların numaraları değişir
+            for position, iid in enumerate(self.point_list.get_children()[rows[0]:], start=rows[0] + 1):
+                self.point_list.set(iid, 'id', position)
+            self._update_count()
 
     def add_collection_point(self):
-        point_frame = WasteCollectionFrame(
-            self.collection_points_frame, 
-            len(self.collection_point_frames) + 1, 
-            self.locations,
-            on_delete=self.delete_collection_point
+        try:
+            point = self.editor.get_point_data()
+        except ValueError as e:
+            messagebox.showerror("Hata", f"Geçersiz giriş: {str(e)}")
+            return
+        self.append_collection_points(PointStore.from_points([point]))
+        self.point_list.see(self.point_list.get_children()[-1])
+
+    def update_collection_point(self):
+        rows = self._selected_rows()
+        if len(rows) != 1:
+            messagebox.showerror("Hata", "Lütfen güncellemek için listeden tek bir nokta seçin")
+            return
+        try:
+            point = self.editor.get_point_data()
+        except ValueError as e:
+            messagebox.showerror("Hata", f"Geçersiz giriş: {str(e)}")
+            return
+        self.collection_points.update(rows[0], point.name, point.lat, point.lon)
+        self.point_list.item(self.point_list.selection()[0], values=self._row_values(rows[0]))
+
+    def import_collection_points(self):
+        """Bir xlsx/csv dosyasındaki tüm noktaları listeye toplu olarak ekler"""
+        path = filedialog.askopenfilename(
+            title="Atık toplama noktalarını içe aktar",
+            filetypes=[("Excel veya CSV", "*.xlsx *.csv"), ("Tüm dosyalar", "*.*")]
         )
-        point_frame.pack(fill='x', pady=5, padx=5)
-        self.collection_point_frames.append(point_frame)
-        # Frame güncellendiğinde scrollbar'ı güncelle
-        self.collection_points_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        if not path:
+            return
+        try:
+            points, errors = load_demand_points(path)
+        except (FileNotFoundError, ValueError) as e:
+            messagebox.showerror("Hata", str(e))
+            return
+        self.append_collection_points(points)
+        message = f"{len(points)} nokta içe aktarıldı."
+        if errors:
+            message += f"\n{len(errors)} satır atlandı (ilk hata: satır {errors[0].row}: {errors[0].message})"
+        messagebox.showinfo("İçe Aktarma", message)
 
     def load_locations(self):
         try:
-            excel_path = 'talep_noktalari_guncellenmis.xlsx'
-            if not os.path.exists(excel_path):
-                messagebox.showerror("Hata", f"'{excel_path}' dosyası bulunamadı!")
-                return []
-                
-            df = pd.read_excel(excel_path)
-            
-            if 'Mahalleler' not in df.columns or 'X' not in df.columns or 'Y' not in df.columns:
-                messagebox.showerror("Hata", "Excel dosyasında gerekli sütunlar (Mahalleler, X, Y) bulunamadı!")
-                return []
-                
-            locations = []
-            for _, row in df.iterrows():
-                if pd.notna(row['Mahalleler']) and pd.notna(row['X']) and pd.notna(row['Y']):
-                    locations.append(Location(
-                        name=row['Mahalleler'],
-                        lon=float(row['X']),
-                        lat=float(row['Y'])
-                    ))
-            
-            if not locations:
-                messagebox.showwarning("Uyarı", "Excel dosyasından hiç konum verisi yüklenemedi!")
-                
-            return locations
+            locations, errors = load_demand_points(self.demand_path)
+        except (FileNotFoundError, ValueError) as e:
+            messagebox.showerror("Hata", str(e))
+            return PointStore.empty()
         except Exception as e:
             messagebox.showerror("Hata", f"Konum verileri yüklenirken bir hata oluştu: {str(e)}")
-            return []
+            return PointStore.empty()
+
+        if errors:
+            details = "\n".join(f"Satır {err.row}: {err.message}" for err in errors[:10])
+            if len(errors) > 10:
+                details += f"\n... ve {len(errors) - 10} satır daha"
+            messagebox.showwarning("Uyarı", f"{len(errors)} satır atlandı:\n{details}")
+
+        if not len(locations):
+            messagebox.showwarning("Uyarı", "Dosyadan hiç konum verisi yüklenemedi!")
+
+        return locations
 
     def place_charging_stations(self):
-        if not self.locations:
-            return []
+        return place_charging_stations(self.locations)
 
-        # Konumları numpy dizisine dönüştür
-        points = np.array([[loc.lat, loc.lon] for loc in self.locations])
-        
-        # K-means ile 3 küme oluştur
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        kmeans.fit(points)
-        
-        # Her kümenin merkezini şarj istasyonu olarak kullan
-        charging_stations = []
-        for i, center in enumerate(kmeans.cluster_centers_):
-            charging_stations.append(ChargingStation(
-                id=i+1,
-                lat=center[0],
-                lon=center[1]
-            ))
-        
-        return charging_stations
+    def load_distance_matrix(self, matrix_dir):
+        if not os.path.exists(os.path.join(matrix_dir, 'index.json')):
+            return None
+        try:
+            return DistanceMatrix.open(matrix_dir)
+        except Exception as e:
+            messagebox.showwarning("Uyarı", f"Mesafe matrisi okunamadı, canlı sorgular kullanılacak: {str(e)}")
+            return None
 
     def get_route_with_charging(self, start: Tuple[float, float], end: Tuple[float, float],
-                              vehicle: ElectricVehicle) -> List[Tuple[float, float]]:
-        """Başlangıç ve bitiş noktaları arasında şarj istasyonlarını da içeren rota oluşturur"""
-        route = []
+                              vehicle: ElectricVehicle) -> np.ndarray:
+        """Başlangıç ve bitiş noktaları arasında şarj istasyonlarını da içeren rota (enlem, boylam) dizisi oluşturur"""
         current_pos = start
         remaining_range = vehicle.current_charge_percentage
 
         # Rota üzerindeki en yakın şarj istasyonunu bul
-        nearest_station = min(self.charging_stations,
-                            key=lambda x: get_osrm_distance(current_pos[0], current_pos[1], x.lat, x.lon))
+        stations = self.charging_stations
+        nearest = min(range(len(stations)),
+                      key=lambda s: get_osrm_distance(current_pos[0], current_pos[1], *stations.coord(s)))
+        station_lat, station_lon = stations.coord(nearest)
 
         # Şarj istasyonuna git
-        station_distance = get_osrm_distance(current_pos[0], current_pos[1], nearest_station.lat, nearest_station.lon)
-        route.extend(get_osrm_route_geometry(current_pos[0], current_pos[1], nearest_station.lat, nearest_station.lon))
+        station_distance = get_osrm_distance(current_pos[0], current_pos[1], station_lat, station_lon)
+        to_station = get_osrm_route_geometry(current_pos[0], current_pos[1], station_lat, station_lon)
 
         # Şarj istasyonunda şarj et
         vehicle.current_charge_percentage = 100.0
 
         # Varış noktasına git
-        route.extend(get_osrm_route_geometry(nearest_station.lat, nearest_station.lon, end[0], end[1]))
+        to_end = get_osrm_route_geometry(station_lat, station_lon, end[0], end[1])
 
-        return route
+        return RouteGeometry.from_legs([to_station, to_end]).coords
 
-    def plot_routes(self, collection_points):
-        # İlk noktayı başlangıç noktası olarak al
-        start_point = collection_points[0]
-        m = folium.Map(location=[start_point.lat, start_point.lon], zoom_start=12)
-        
-        # Atık toplama noktalarını işaretle
-        for point in collection_points:
-            folium.Marker(
-                [point.lat, point.lon],
-                popup=f'Atık Toplama Noktası: {point.name}',
-                icon=folium.Icon(color='blue', icon='trash', prefix='fa')
-            ).add_to(m)
+    def plot_routes(self, collection_points: PointStore, on_progress=None, stop=None):
+        # Aynı nokta listesi daha önce hesaplandıysa önbellekteki harita kullanılır
+        plan, path = self.planner.solve(collection_points, on_progress=on_progress, stop=stop)
 
-        # Şarj istasyonlarını işaretle
-        for station in self.charging_stations:
-            folium.Marker(
-                [station.lat, station.lon],
-                popup=f'Şarj İstasyonu {station.id}',
-                icon=folium.Icon(color='green', icon='bolt', prefix='fa')
-            ).add_to(m)
+        # Haritayı göster
+        webbrowser.open(os.path.abspath(path))
+        return plan, path
 
-        # Rotayı oluştur
-        vehicle = ElectricVehicle(id=1)
-        route_points = []
-        current_location = (start_point.lat, start_point.lon)
-
-        for i in range(1, len(collection_points)):
-            next_point = collection_points[i]
-            
-            # Eğer şarj gerekiyorsa, en yakın şarj istasyonuna git
-            if vehicle.needs_charging():
-                nearest_station = min(self.charging_stations,
-                                    key=lambda x: get_osrm_distance(current_location[0], current_location[1], x.lat, x.lon))
-                
-                # Şarj istasyonuna git
-                charging_route = get_osrm_route_geometry(current_location[0], current_location[1],
-                                                       nearest_station.lat, nearest_station.lon)
-                route_points.extend(charging_route)
-                
-                # Şarj et
-                vehicle.current_charge_percentage = 100.0
-                current_location = (nearest_station.lat, nearest_station.lon)
-
-            # Bir sonraki atık toplama noktasına git
-            route_to_next = get_osrm_route_geometry(current_location[0], current_location[1],
-                                                  next_point.lat, next_point.lon)
-            route_points.extend(route_to_next)
-            vehicle.drive(get_osrm_distance(current_location[0], current_location[1],
-                                          next_point.lat, next_point.lon))
-            current_location = (next_point.lat, next_point.lon)
+    def solve_routing(self):
+        if self._solver_thread is not None:
+            return
+        if not len(self.collection_points):
+            messagebox.showerror("Hata", "Lütfen en az bir atık toplama noktası ekleyin")
+            return
 
-        # AntPath ile rotayı çiz
-        plugins.AntPath(
-            locations=route_points,
-            color='red',
-            weight=5,
-            opacity=0.8,
-            delay=1000,
-            dash_array=[10, 20],
-            pulse_color='#FFFFFF'
-        ).add_to(m)
+        self._stop_event.clear()
+        self.solve_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        self.status_var.set("Rota hesaplanıyor...")
+        # Liste yerinde düzenlendiği için çözücüye o anki noktaların kopyası verilir
+        snapshot = self.collection_points.subset(np.arange(len(self.collection_points)))
+        self._solver_thread = threading.Thread(target=self._solve_in_background, args=(snapshot,), daemon=True)
+        self._solver_thread.start()
+        self.root.after(100, self._poll_solver)
 
-        # Haritayı kaydet ve göster
-        m.save('waste_collection_route.html')
-        webbrowser.open('waste_collection_route.html')
+    def stop_routing(self):
+        """Aramayı durdurur; o ana kadarki en iyi rota gösterilir"""
+        self._stop_event.set()
+        self.stop_button.config(state=tk.DISABLED)
 
-    def solve_routing(self):
-        try:
-            if not self.collection_point_frames:
-                messagebox.showerror("Hata", "Lütfen en az bir atık toplama noktası ekleyin")
-                return
+    def _solve_in_background(self, collection_points: PointStore):
+        def report(progress, plan):
+            self._progress_queue.put(('progress', progress))
 
-            collection_points = []
-            for frame in self.collection_point_frames:
-                collection_points.append(frame.get_point_data())
+        try:
+            self._progress_queue.put(('done', self.plot_routes(collection_points, on_progress=report,
+                                                               stop=self._stop_event.is_set)))
+        except Exception as e:
+            self._progress_queue.put(('error', e))
 
-            self.plot_routes(collection_points)
-            messagebox.showinfo("Başarılı", "Optimum rota hesaplandı. Harita tarayıcınızda açılacak.")
+    def _poll_solver(self):
+        # Tk yalnızca ana iş parçacığından güncellenir
+        while True:
+            try:
+                kind, value = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self.status_var.set(f"Nesil {value.generation}: en iyi rota {value.cost:.2f} km "
+                                    f"({value.elapsed:.1f} sn)")
+            else:
+                self._finish_routing(kind, value)
+                return
+        self.root.after(100, self._poll_solver)
 
-        except ValueError as e:
-            messagebox.showerror("Hata", f"Geçersiz giriş: {str(e)}")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Bir hata oluştu: {str(e)}")
+    def _finish_routing(self, kind, value):
+        self._solver_thread = None
+        self.solve_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        if kind == 'error':
+            self.status_var.set("")
+            if isinstance(value, ValueError):
+                messagebox.showerror("Hata", f"Geçersiz giriş: {str(value)}")
+            else:
+                messagebox.showerror("Hata", f"Bir hata oluştu: {str(value)}")
+            return
+        plan, path = value
+        self.status_var.set(f"Rota: {plan.distance:.2f} km, {plan.duration / 60:.1f} dk")
+        messagebox.showinfo("Başarılı", "Optimum rota hesaplandı. Harita tarayıcınızda açılacak.")
 
 def get_bearing(point1, point2):
     """İki nokta arasındaki açıyı hesaplar"""
@@ -420,29 +1851,548 @@ def get_bearing(point1, point2):
 
     return compass_bearing
 
-def get_osrm_route_geometry(lat1, lon1, lat2, lon2, osrm_url="http://router.project-osrm.org/route/v1/driving/"):
-    url = f"{osrm_url}{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
+def get_bearings(lat1, lon1, lat2, lon2):
+    """get_bearing'in NumPy sürümü: koordinat dizileri arasındaki pusula açılarını (derece) hesaplar"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    diff_lon = np.radians(np.asarray(lon2) - np.asarray(lon1))
+
+    x = np.sin(diff_lon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - (np.sin(lat1) * np.cos(lat2) * np.cos(diff_lon))
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+def sweep_order(coords, depot: Tuple[float, float]) -> np.ndarray:
+    """Noktaları depo etrafındaki açılarına göre sıralar (polar tarama), O(n log n).
+
+    Tarama, ardışık noktalar arasındaki en büyük açısal boşluktan sonra başlar.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) < 2:
+        return np.arange(len(coords))
+    bearings = get_bearings(depot[0], depot[1], coords[:, 0], coords[:, 1])
+    order = np.argsort(bearings, kind='stable')
+    sorted_bearings = bearings[order]
+    gaps = np.diff(np.append(sorted_bearings, sorted_bearings[0] + 360))
+    return np.roll(order, -((int(np.argmax(gaps)) + 1) % len(order)))
+
+def sweep_sectors(coords, depot: Tuple[float, float], n_sectors: int) -> List[np.ndarray]:
+    """Tarama sırasını araç başına yaklaşık eşit büyüklükte ardışık açısal sektörlere böler"""
+    return np.array_split(sweep_order(coords, depot), n_sectors)
+
+class CircuitBreaker:
+    """Art arda hatalardan sonra devreyi açar; bekleme süresi boyunca istek yapılmasına izin vermez.
+
+    Süre dolunca tek bir deneme isteğine izin verilir (yarı açık); başarılı olursa devre kapanır.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            # Yarı açık: bir sonraki hataya kadar tek deneme
+            self.opened_at = None
+            self.failures = self.failure_threshold - 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                print(f"OSRM devre kesici açıldı: {self.cooldown:.0f} sn boyunca yerel tahmin kullanılacak")
+
+class RoadDistanceEstimator:
+    """Kuş uçuşu mesafeyi yol katsayısıyla ölçekleyen yerel tahminci.
+
+    Katsayı ve ortalama hız, aynı bölge için daha önce alınmış OSRM sonuçlarından (mesafe matrisi ve
+    çift sorguları) medyan oranla kalibre edilir.
+    """
+
+    def __init__(self, road_factor: float = 1.3, speed_kmh: float = FALLBACK_SPEED_KMH,
+                 max_samples: int = ESTIMATOR_SAMPLES):
+        self.road_factor = road_factor
+        self.speed_kmh = speed_kmh
+        self.max_samples = max_samples
+        self._factors = []
+        self._speeds = []
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def observe(self, straight, road, duration):
+        """OSRM'den gelen gerçek mesafe (km) ve süre (sn) değerlerini kalibrasyon örneği olarak ekler"""
+        straight = np.ravel(np.asarray(straight, dtype=np.float64))
+        road = np.ravel(np.asarray(road, dtype=np.float64))
+        duration = np.ravel(np.asarray(duration, dtype=np.float64))
+        valid = (straight > 0.05) & np.isfinite(road) & np.isfinite(duration) & (duration > 0)
+        if not valid.any():
+            return
+        with self._lock:
+            self._factors.extend((road[valid] / straight[valid]).tolist())
+            self._speeds.extend((road[valid] / (duration[valid] / 3600)).tolist())
+            del self._factors[:-self.max_samples], self._speeds[:-self.max_samples]
+            self._dirty = True
+
+    def calibrate_from_matrix(self, matrix: DistanceMatrix, sample_size: int = ESTIMATOR_SAMPLES, seed: int = 0):
+        n = len(matrix.coords)
+        if n < 2:
+            return
+        rng = np.random.default_rng(seed)
+        rows = rng.integers(0, n, sample_size)
+        cols = rng.integers(0, n, sample_size)
+        if matrix.estimated is not None:
+            # Tahminle doldurulmuş hücreler katsayının kendisinden türetildiği için örneklenmez
+            measured = ~np.asarray(matrix.estimated[rows, cols], dtype=bool)
+            rows, cols = rows[measured], cols[measured]
+        self.observe(straight_line_distance(matrix.coords[rows, 0], matrix.coords[rows, 1],
+                                            matrix.coords[cols, 0], matrix.coords[cols, 1]),
+                     matrix.distance[rows, cols], matrix.duration[rows, cols])
+
+    def _refresh(self):
+        with self._lock:
+            if self._dirty:
+                self.road_factor = float(np.median(self._factors))
+                self.speed_kmh = float(np.median(self._speeds))
+                self._dirty = False
+
+    def distance(self, lat1, lon1, lat2, lon2):
+        return self.from_straight(straight_line_distance(lat1, lon1, lat2, lon2))[0]
+
+    def from_straight(self, straight):
+        """Kuş uçuşu mesafelerden (km) güncel kalibrasyonla tahmini yol mesafesi (km) ve süresi (sn)"""
+        self._refresh()
+        road = np.asarray(straight, dtype=np.float64) * self.road_factor
+        return road, road / self.speed_kmh * 3600
+
+    def duration(self, lat1, lon1, lat2, lon2):
+        return self.distance(lat1, lon1, lat2, lon2) / self.speed_kmh * 3600
+
+class CoordinateSnapper:
+    """Ham koordinatları OSRM /nearest ile en yakın yol noktasına oturtur.
+
+    Sonuç ham koordinat başına önbelleğe alınır; birbirine çok yakın girişler aynı yol noktasına
+    düştüğü için sonraki mesafe, tablo ve geometri önbellekleri bu noktalar üzerinden paylaşılır.
+    Sorgu başarısız olursa ham koordinat döner ve önbelleğe yazılmaz.
+    """
+
+    def __init__(self, url: str = OSRM_NEAREST_URL, max_entries: int = SNAP_CACHE_SIZE):
+        self.url = url
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def snap(self, lat, lon) -> Tuple[float, float]:
+        key = (float(lat), float(lon))
+        snapped = self._cache.get(key)
+        if snapped is not None:
+            self.hits += 1
+            return snapped
+        self.misses += 1
+        routing_calls['nearest'] += 1
+        data = _osrm_get(f"{self.url}{key[1]},{key[0]}?number=1")
+        try:
+            snapped_lon, snapped_lat = data['waypoints'][0]['location']
+        except (TypeError, KeyError, IndexError, ValueError):
+            return key
+        snapped = (round(float(snapped_lat), 6), round(float(snapped_lon), 6))
+        self._cache[key] = snapped
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return snapped
+
+    def snap_many(self, coords) -> np.ndarray:
+        """(enlem, boylam) satırlarını oturtur; aynı ham koordinat yalnızca bir kez sorgulanır"""
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        return np.array([self.snap(lat, lon) for lat, lon in coords.tolist()], dtype=np.float64).reshape(-1, 2)
+
+osrm_breaker = CircuitBreaker()
+road_estimator = RoadDistanceEstimator()
+_routing_backend = None  # ayarlanırsa OSRM yerine kullanılan yerel rota motoru (osm_router.LocalRoutingEngine)
+
+def set_routing_backend(backend):
+    """get_osrm_* fonksiyonlarını yerel bir rota motoruna yönlendirir (None: OSRM sunucusu)"""
+    global _routing_backend
+    _routing_backend = backend
+
+OSM_GRAPH_HELP = "OSRM sunucusu yerine kullanılacak yerel yol ağı (.osm, .osm.pbf veya .npz)"
+
+def use_osm_graph(path: str = None):
+    """``--osm-graph`` seçeneği: yol ağı dosyası verilmişse rota sorgularını yerel motora yönlendirir"""
+    if path:
+        set_routing_backend(LocalRoutingEngine.from_file(path))
+
+def routing_identity() -> dict:
+    """Mesafe ve sürelerin kaynağı: yerel motorun kimliği ya da OSRM sunucusu ve koordinat oturtma ayarı"""
+    if _routing_backend is not None:
+        return _routing_backend.identity()
+    return {'engine': 'osrm', 'url': OSRM_TABLE_URL, 'snap': SNAP_TO_ROAD}
+_osrm_pair_cache = OrderedDict()  # (kaynak, hedef) -> (km, sn) gerçek OSRM sonuçları
+_osrm_geometry_cache = OrderedDict()  # (kaynak, hedef) -> ayak geometrisi
+routing_calls = Counter()  # önbellekten karşılanmayan rota sorgusu sayıları ('route', 'table', 'distance', 'nearest')
+coordinate_snapper = CoordinateSnapper()
+
+def _snap(lat, lon):
+    return coordinate_snapper.snap(lat, lon) if SNAP_TO_ROAD else (lat, lon)
+
+def _pair_key(lat1, lon1, lat2, lon2):
+    return (round(lat1, 6), round(lon1, 6), round(lat2, 6), round(lon2, 6))
+
+def _cache_put(cache, key, value, max_entries):
+    cache[key] = value
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+
+def _osrm_get(url):
+    """Devre kesiciye bağlı, zaman aşımlı OSRM isteği; devre açıksa ya da istek başarısızsa None döner.
+
+    Yalnızca zaman aşımı, bağlantı hataları ve 5xx yanıtları devre kesicide hata sayılır. NoRoute, NoSegment,
+    TooBig gibi isteğe özgü hatalar sunucunun sağlıklı olduğunu gösterir; None döner ama devreyi etkilemez.
+    """
+    if not osrm_breaker.allow():
+        return None
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=OSRM_TIMEOUT)
+        if response.status_code >= 500:
+            raise requests.HTTPError(f"{response.status_code} sunucu hatası", response=response)
         data = response.json()
-        geometry = data['routes'][0]['geometry']['coordinates']
-        return [(lat, lon) for lon, lat in geometry]
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
+        osrm_breaker.record_failure()
         print(f"OSRM request error: {e}")
-        return [(lat1, lon1), (lat2, lon2)]
+        return None
+    osrm_breaker.record_success()
+    code = data.get('code', 'Ok') if isinstance(data, dict) else None
+    if response.status_code >= 400 or code != 'Ok':
+        message = data.get('message', code) if isinstance(data, dict) else response.status_code
+        print(f"OSRM request error: {message}")
+        return None
+    return data
+
+def _remember_pair(lat1, lon1, lat2, lon2, distance, duration):
+    _cache_put(_osrm_pair_cache, _pair_key(lat1, lon1, lat2, lon2), (distance, duration), OSRM_CACHE_SIZE)
+    road_estimator.observe(straight_line_distance(lat1, lon1, lat2, lon2), distance, duration)
+
+def get_osrm_route_geometry(lat1, lon1, lat2, lon2, osrm_url="http://router.project-osrm.org/route/v1/driving/"):
+    """İki nokta arasındaki yol geometrisi, (N, 2) boyutlu (enlem, boylam) dizisi"""
+    if _routing_backend is not None:
+        routing_calls['route'] += 1
+        return _routing_backend.route_geometry(lat1, lon1, lat2, lon2)
+    (lat1, lon1), (lat2, lon2) = _snap(lat1, lon1), _snap(lat2, lon2)
+    key = _pair_key(lat1, lon1, lat2, lon2)
+    cached = _osrm_geometry_cache.get(key)
+    if cached is not None:
+        return cached
+    routing_calls['route'] += 1
+    url = f"{osrm_url}{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
+    data = _osrm_get(url)
+    try:
+        route = data['routes'][0]
+        _remember_pair(lat1, lon1, lat2, lon2, route['distance'] / 1000, route['duration'])
+        # GeoJSON (boylam, enlem) sırasını kopyasız görünümle (enlem, boylam) sırasına çevir
+        geometry = np.asarray(route['geometry']['coordinates'], dtype=np.float64).reshape(-1, 2)[:, ::-1]
+    except (TypeError, KeyError, IndexError, ValueError):
+        return np.array([[lat1, lon1], [lat2, lon2]], dtype=np.float64)
+    geometry.flags.writeable = False  # önbellekteki dizi paylaşılır
+    _cache_put(_osrm_geometry_cache, key, geometry, GEOMETRY_CACHE_SIZE)
+    return geometry
+
+def get_osrm_table(sources, destinations, osrm_url=OSRM_TABLE_URL, return_estimated=False):
+    """Kaynak ve hedef koordinatları ((enlem, boylam) satırları) arasındaki mesafe (km) ve süre (sn) matrisleri.
+
+    ``return_estimated`` verilirse yol verisi yerine kuş uçuşu tahminiyle doldurulan hücrelerin maskesi de döner.
+    """
+    if _routing_backend is not None:
+        routing_calls['table'] += 1
+        distance, duration = _routing_backend.table(sources, destinations)
+        # Yerel motorda ulaşılamayan çiftler sonsuz döner; OSRM'deki null gibi tahminle doldurulur
+        missing = ~(np.isfinite(distance) & np.isfinite(duration))
+        if missing.any():
+            sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+            destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+            straight = straight_line_distance(sources[:, :1], sources[:, 1:], destinations[:, 0], destinations[:, 1])
+            estimate, estimate_duration = road_estimator.from_straight(straight)
+            distance, duration = np.where(missing, estimate, distance), np.where(missing, estimate_duration, duration)
+        if return_estimated:
+            return distance, duration, missing
+        return distance, duration
+    sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+    if SNAP_TO_ROAD:
+        sources, destinations = coordinate_snapper.snap_many(sources), coordinate_snapper.snap_many(destinations)
+
+    # Tüm çiftler daha önceki isteklerden biliniyorsa yeni istek yapılmaz
+    keys = [[_pair_key(lat1, lon1, lat2, lon2) for lat2, lon2 in destinations.tolist()]
+            for lat1, lon1 in sources.tolist()]
+    cached = [_osrm_pair_cache.get(key) for row in keys for key in row]
+    if cached and all(value is not None for value in cached):
+        values = np.array(cached, dtype=np.float64).reshape(len(sources), len(destinations), 2)
+        if return_estimated:
+            return values[..., 0], values[..., 1], np.zeros(values.shape[:2], dtype=bool)
+        return values[..., 0], values[..., 1]
+
+    routing_calls['table'] += 1
+    n_sources = len(sources)
+    coords = ';'.join(f"{lon},{lat}" for lat, lon in np.vstack([sources, destinations]))
+    source_ids = ';'.join(str(i) for i in range(n_sources))
+    destination_ids = ';'.join(str(i) for i in range(n_sources, n_sources + len(destinations)))
+    url = f"{osrm_url}{coords}?sources={source_ids}&destinations={destination_ids}&annotations=distance,duration"
+
+    straight = straight_line_distance(sources[:, :1], sources[:, 1:], destinations[:, 0], destinations[:, 1])
+    data = _osrm_get(url)
+    try:
+        distance = np.array(data['distances'], dtype=np.float64) / 1000
+        duration = np.array(data['durations'], dtype=np.float64)
+        road_estimator.observe(straight, distance, duration)
+        for row, row_keys in enumerate(keys):
+            for col, key in enumerate(row_keys):
+                if not (math.isnan(distance[row, col]) or math.isnan(duration[row, col])):
+                    _cache_put(_osrm_pair_cache, key, (distance[row, col], duration[row, col]), OSRM_CACHE_SIZE)
+    except (TypeError, KeyError, ValueError):
+        distance = np.full(straight.shape, np.nan)
+        duration = np.full(straight.shape, np.nan)
+
+    # Ulaşılamayan çiftler için kalibre edilmiş yerel tahmin kullan
+    missing = np.isnan(distance) | np.isnan(duration)
+    if missing.any():
+        estimate, estimate_duration = road_estimator.from_straight(straight)
+        distance[missing] = estimate[missing]
+        duration[missing] = estimate_duration[missing]
+    if return_estimated:
+        return distance, duration, missing
+    return distance, duration
+
+def get_osrm_table_blocked(sources, destinations, block_size: int = OSRM_TABLE_BLOCK, return_estimated=False):
+    """``get_osrm_table`` ile aynı, ancak istek en fazla ``block_size`` kaynak/hedeflik bloklara bölünür.
+
+    Tek bir büyük table isteği OSRM sınırlarını (TooBig, URL uzunluğu) aşıp tüm matrisin tahmine düşmesine
+    yol açacağından bellek içi matrisler bu fonksiyonla hesaplanır.
+    """
+    sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+    distance = np.empty((len(sources), len(destinations)))
+    duration = np.empty_like(distance)
+    estimated = np.zeros(distance.shape, dtype=bool)
+    for row in range(0, len(sources), block_size):
+        rows = slice(row, row + block_size)
+        for col in range(0, len(destinations), block_size):
+            cols = slice(col, col + block_size)
+            distance[rows, cols], duration[rows, cols], estimated[rows, cols] = get_osrm_table(
+                sources[rows], destinations[cols], return_estimated=True)
+    if return_estimated:
+        return distance, duration, estimated
+    return distance, duration
 
 def get_osrm_distance(lat1, lon1, lat2, lon2, osrm_url="http://router.project-osrm.org/route/v1/driving/"):
+    if _routing_backend is not None:
+        routing_calls['distance'] += 1
+        distance = _routing_backend.distance(lat1, lon1, lat2, lon2)
+        return distance if math.isfinite(distance) else float(road_estimator.distance(lat1, lon1, lat2, lon2))
+    (lat1, lon1), (lat2, lon2) = _snap(lat1, lon1), _snap(lat2, lon2)
+    cached = _osrm_pair_cache.get(_pair_key(lat1, lon1, lat2, lon2))
+    if cached is not None:
+        return cached[0]
+    routing_calls['distance'] += 1
     url = f"{osrm_url}{lon1},{lat1};{lon2},{lat2}?overview=false"
+    data = _osrm_get(url)
     try:
-        response = requests.get(url)
-        data = response.json()
-        distance = data['routes'][0]['distance'] / 1000
+        route = data['routes'][0]
+        distance = route['distance'] / 1000
+        _remember_pair(lat1, lon1, lat2, lon2, distance, route['duration'])
         return distance
-    except Exception as e:
-        print(f"OSRM request error: {e}")
-        return math.sqrt((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2) * 111
+    except (TypeError, KeyError, IndexError):
+        return float(road_estimator.distance(lat1, lon1, lat2, lon2))
+
+class _StackSampler(threading.Thread):
+    """Profil alınan iş parçacığının çağrı yığınını düzenli aralıklarla örnekler (flamegraph için)"""
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+# Profil raporunda ayrıca gösterilecek fonksiyonlar: (etiket, eşleşme koşulu)
+PROFILE_HOTSPOTS = (
+    ('get_osrm_*', lambda filename, name: name.startswith('get_osrm_')),
+    ('KMeans.fit', lambda filename, name: name == 'fit' and '_kmeans' in filename),
+    ('folium Map.save', lambda filename, name: name == 'save' and 'branca' in filename),
+)
+
+@contextmanager
+def profiled(prefix: str, top: int = 15):
+    """Bloğu cProfile ve tracemalloc altında çalıştırır.
+
+    ``<prefix>.pstats`` ve flamegraph araçlarının okuyabileceği ``<prefix>.collapsed`` dosyalarını yazar,
+    en yavaş fonksiyonları ve en çok bellek ayıran satırları yazdırır.
+    """
+    sampler = _StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{prefix}.pstats")
+        with open(f"{prefix}.collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in sampler.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+        stats = pstats.Stats(profiler)
+        print(f"\n=== En yavaş {top} fonksiyon (kümülatif süre) ===")
+        stats.sort_stats('cumulative').print_stats(top)
+
+        print("=== İzlenen fonksiyonlar ===")
+        for label, matches in PROFILE_HOTSPOTS:
+            calls = cumulative = 0.0
+            for (filename, _, name), (_, ncalls, _, cumtime, _) in stats.stats.items():
+                if matches(filename, name):
+                    calls += ncalls
+                    cumulative += cumtime
+            print(f"{label:<20} {int(calls):>8} çağrı {cumulative:>10.3f} sn")
+
+        print(f"\n=== En çok bellek ayıran {top} satır ===")
+        for stat in snapshot.statistics('lineno')[:top]:
+            print(stat)
+        print(f"\nProfil dosyaları: {prefix}.pstats, {prefix}.collapsed")
+
+BATCH_PROFILE_HELP = ("Çalıştırmayı profil alarak yap (PREFIX.pstats, PREFIX.collapsed); "
+                      "yalnızca ana süreç ölçülür, paralel işçi süreçleri rapora girmez")
+
+@contextmanager
+def profiled_if(prefix: str = None):
+    """``--profile`` seçeneği: ön ek verilmişse bloğu ``profiled`` altında, verilmemişse olduğu gibi çalıştırır"""
+    if not prefix:
+        yield None
+        return
+    with profiled(prefix) as profiler:
+        yield profiler
+
+def solve_headless(demand_path: str = DEMAND_FILE, matrix_dir: str = MATRIX_DIR, point_names=None,
+                   map_path: str = 'waste_collection_route.html', export_formats=(), output_prefix: str = 'rota',
+                   render_html: bool = True, seed=RANDOM_SEED, vehicle_type: str = DEFAULT_VEHICLE_TYPE,
+                   time_budget: float = TIME_BUDGET, show_progress: bool = False, payload_t: float = None,
+                   compare_fleet: bool = False):
+    """Arayüz olmadan yükleme, istasyon yerleştirme, rota hesaplama ve çıktı adımlarını çalıştırır.
+
+    HTML harita isteğe bağlı son adımdır; ``render_html=False`` ile folium hiç yüklenmez.
+    ``compare_fleet`` ile bulunan ziyaret sırası tüm araç tiplerinin şarj planıyla da denenir.
+    """
+    locations, errors = load_demand_points(demand_path)
+    for err in errors:
+        print(f"Satır {err.row}: {err.message}")
+    planner = RoutePlanner(locations, matrix=DistanceMatrix.open_if_exists(matrix_dir), seed=seed,
+                           vehicle_type=VEHICLE_TYPES[vehicle_type], payload_t=payload_t)
+
+    if point_names:
+        indexes = [locations.index_of(name) for name in point_names]
+        unknown = [name for name, index in zip(point_names, indexes) if index < 0]
+        if unknown:
+            raise ValueError(f"Bilinmeyen mahalle(ler): {', '.join(unknown)}")
+        points = locations.subset(indexes)
+    else:
+        points = locations
+
+    def report(progress, plan):
+        print(f"Nesil {progress.generation}: {plan.distance:.2f} km ({progress.elapsed:.1f} sn)")
+
+    plan = planner.plan_route(points, on_progress=report if show_progress else None, time_budget=time_budget)
+    outputs = [planner.export_route(points, plan, f"{output_prefix}.{fmt}", fmt) for fmt in export_formats]
+    if render_html:
+        outputs.append(planner.render_route(points, plan, map_path))
+    print(f"{len(points)} nokta, {plan.distance:.2f} km, {plan.duration / 60:.1f} dk -> {', '.join(outputs)}")
+    if compare_fleet:
+        order = [node for node in plan.sequence if node < len(points)]
+        for name, charging in planner.fleet_feasibility(points, order).items():
+            print(f"  {name:9s} " + (f"uygun, {len(charging.insertions)} şarj durağı, +{charging.cost:.2f} km"
+                                     if charging.feasible else "uygulanamaz"))
+    return plan
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Elektrikli Atık Toplama Aracı Rotalama Sistemi")
+    parser.add_argument('--demand', default=DEMAND_FILE, help="Talep noktası dosyası (.xlsx veya .csv)")
+    parser.add_argument('--matrix-dir', default=MATRIX_DIR, help="Mesafe matrisi klasörü")
+    parser.add_argument('--build-matrix', action='store_true',
+                        help="Tüm konumlar ve şarj istasyonları için mesafe/süre matrislerini hesaplayıp kaydet")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="Arayüzü açmadan tek bir çözümü profil alarak çalıştır (PREFIX.pstats, PREFIX.collapsed)")
+    parser.add_argument('--points', help="Arayüzsüz çözümde kullanılacak mahalleler (virgülle ayrılmış, varsayılan: tümü)")
+    parser.add_argument('--export', help=f"Arayüzü açmadan çöz ve rotayı yaz ({', '.join(EXPORT_FORMATS)}; virgülle ayrılmış)")
+    parser.add_argument('--output', default='rota', help="Dışa aktarılan dosyaların ön eki")
+    parser.add_argument('--no-html', action='store_true', help="Arayüzsüz çözümde HTML harita oluşturma")
+    parser.add_argument('--vehicle-type', default=DEFAULT_VEHICLE_TYPE, choices=sorted(VEHICLE_TYPES),
+                        help="Arayüzsüz çözümde araç tipi")
+    parser.add_argument('--payload', type=float, help="Taşınan yük (ton; varsayılan: tam yük, en kötü durum)")
+    parser.add_argument('--fleet', action='store_true', help="Arayüzsüz çözümde bulunan sırayı tüm araç tipleriyle dene")
+    parser.add_argument('--time-budget', type=float, default=TIME_BUDGET, help="Arayüzsüz çözümde en uzun arama süresi (sn)")
+    parser.add_argument('--progress', action='store_true', help="Arayüzsüz çözümde iyileşen ara sonuçları yazdır")
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help="Arayüzsüz çözümde GA tohumu")
+    parser.add_argument('--osm-graph', help=OSM_GRAPH_HELP)
+    args = parser.parse_args()
+
+    use_osm_graph(args.osm_graph)
+
+    if args.profile or args.export or args.no_html:
+        point_names = [name.strip() for name in args.points.split(',')] if args.points else None
+        export_formats = [fmt.strip() for fmt in args.export.split(',')] if args.export else []
+        run = lambda: solve_headless(args.demand, args.matrix_dir, point_names, export_formats=export_formats,
+                                     output_prefix=args.output, render_html=not args.no_html, seed=args.seed,
+                                     vehicle_type=args.vehicle_type, time_budget=args.time_budget,
+                                     show_progress=args.progress, payload_t=args.payload,
+                                     compare_fleet=args.fleet)
+        if args.profile:
+            with profiled(args.profile):
+                run()
+        else:
+            run()
+        raise SystemExit(0)
+
+    if args.build_matrix:
+        locations, errors = load_demand_points(args.demand)
+        for err in errors:
+            print(f"Satır {err.row}: {err.message}")
+        stations = place_charging_stations(locations)
+        matrix = DistanceMatrix.build(args.matrix_dir, locations, stations, demand_file=args.demand)
+        print(f"{matrix.n_locations} konum ve {matrix.n_stations} şarj istasyonu için matris "
+              f"'{args.matrix_dir}' klasörüne kaydedildi")
+        raise SystemExit(0)
+
     root = tk.Tk()
-    app = EVRoutingSolverApp(root)
+    app = EVRoutingSolverApp(root, demand_path=args.demand, matrix_dir=args.matrix_dir)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,315 @@
+import json
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from arp import (CHARGE_RESERVE, DEFAULT_VEHICLE_TYPE, DEMAND_FILE, MATRIX_DIR, OSM_GRAPH_HELP, VEHICLE_TYPES,
+                 ChargingPlan, DistanceMatrix, PointStore, RoutePlan, RoutePlanner, VehicleType,
+                 get_osrm_table_blocked, load_demand_points, optimal_charging_stops, road_estimator,
+                 straight_line_distance, two_opt, use_osm_graph)
+
+# Olaylar satır başına bir JSON nesnesidir (dosya, standart girdi ya da TCP bağlantısı):
+#
+#     {"type": "vehicle", "vehicle": "A1", "lat": 37.76, "lon": 30.55, "battery": 90,
+#      "vehicle_type": "kucuk", "stops": ["Mahalle 1", "Mahalle 2"]}
+#     {"type": "position", "vehicle": "A1", "lat": 37.77, "lon": 30.54, "battery": 84}
+#     {"type": "visited", "vehicle": "A1", "name": "Mahalle 1"}
+#     {"type": "bin", "name": "Mahalle 7", "status": "full"}     # ya da "empty"; yeni noktalar için lat/lon
+#
+# Her olaydan sonra yalnızca etkilenen araçların güncel planı bir JSON satırı olarak yazılır. Planda ayrıca
+# sıradaki duraktan en yakın ve yedek istasyon ile aracın o durağa vardıktan sonra en yakın istasyona hâlâ
+# ulaşıp ulaşamayacağı (station_reachable) bulunur.
+REPAIR_MAX_MOVES = 200  # olay başına en fazla 2-opt hamlesi
+ARRIVAL_RADIUS_KM = 0.05  # araç bir durağa bu kadar yaklaşınca durak ziyaret edilmiş sayılır
+BIN_FULL_STATUSES = ('full', 'overflow', 'dolu', 'tasma', 'taşma')
+BIN_EMPTY_STATUSES = ('empty', 'bos', 'boş')
+LIVE_HOST = '127.0.0.1'
+LIVE_PORT = 8766
+
+@dataclass
+class LiveVehicle:
+    id: str
+    vehicle_type: VehicleType
+    lat: float
+    lon: float
+    battery: float = 100.0  # yüzde
+    stops: PointStore = field(default_factory=PointStore.empty)  # kalan duraklar, ziyaret sırasıyla
+    legs: np.ndarray = None  # konum -> 1. durak -> 2. durak ... ayak mesafeleri (km), şarjsız
+    plan: RoutePlan = None  # düğüm 0 konum, 1..n kalan duraklar, sonrası şarj istasyonları
+    feasible: bool = True
+
+class LiveRouteRepairer:
+    """Araç konumu ve konteyner durumu olaylarıyla araçların kalan rotalarını canlı olarak onarır.
+
+    Her olayda yalnızca etkilenen araçlar yeniden planlanır: konum düğümü için tek satır/sütunluk rota
+    sorgusu, kalan duraklar ve istasyonlar için kayıtlı matris görünümü, ardından sınırlı 2-opt ve aracın
+    anlık bataryasıyla şarj DP'si. GA çalıştırılmaz.
+    """
+
+    def __init__(self, locations: PointStore, matrix: DistanceMatrix = None, stations: PointStore = None):
+        self.locations = locations
+        self.planner = RoutePlanner(locations, stations, matrix=matrix)
+        self.vehicles: Dict[str, LiveVehicle] = {}
+
+    def _vehicle(self, event) -> LiveVehicle:
+        vehicle = self.vehicles.get(str(event.get('vehicle')))
+        if vehicle is None:
+            raise ValueError(f"Bilinmeyen araç: {event.get('vehicle')}")
+        return vehicle
+
+    def _bin(self, event) -> PointStore:
+        """Olaydaki konteyneri tek noktalı PointStore olarak döndürür (mahalle adı ya da lat/lon)"""
+        name = event.get('name')
+        index = self.locations.index_of(name) if name is not None else -1
+        if index >= 0:
+            return self.locations.subset([index])
+        if 'lat' in event and 'lon' in event:
+            return PointStore([0], [(float(event['lat']), float(event['lon']))], [name or 'Yeni konteyner'])
+        raise ValueError(f"Bilinmeyen konteyner: {name}")
+
+    def _stops(self, names) -> PointStore:
+        indexes = [self.locations.index_of(name) for name in names]
+        unknown = [name for name, index in zip(names, indexes) if index < 0]
+        if unknown:
+            raise ValueError(f"Bilinmeyen mahalle(ler): {', '.join(unknown)}")
+        return self.locations.subset(indexes)
+
+    def route_matrices(self, vehicle: LiveVehicle):
+        """Konum (0), kalan duraklar (1..n) ve istasyonlar için (mesafe, süre) matrisleri.
+
+        Duraklar ve istasyonlar arası bölüm kayıtlı matristen okunur; yalnızca konum satırı ve sütunu sorgulanır.
+        """
+        inner_distance, inner_duration = self.planner.route_matrices(vehicle.stops)
+        nodes = self.planner.node_coords(vehicle.stops)
+        position = np.array([[vehicle.lat, vehicle.lon]])
+        out_distance, out_duration = get_osrm_table_blocked(position, nodes)
+        in_distance, in_duration = get_osrm_table_blocked(nodes, position)
+        size = len(nodes) + 1
+        distance, duration = np.zeros((size, size)), np.zeros((size, size))
+        distance[1:, 1:], duration[1:, 1:] = np.asarray(inner_distance), np.asarray(inner_duration)
+        distance[0, 1:], duration[0, 1:] = out_distance[0], out_duration[0]
+        distance[1:, 0], duration[1:, 0] = in_distance[:, 0], in_duration[:, 0]
+        return distance, duration
+
+    def repair(self, vehicle: LiveVehicle) -> LiveVehicle:
+        """Aracın kalan rotasını anlık konum ve bataryadan yeniden sıralar ve şarj duraklarını yeniden seçer"""
+        n_stops = len(vehicle.stops)
+        if not n_stops:
+            vehicle.legs, vehicle.plan, vehicle.feasible = np.empty(0), RoutePlan(sequence=[0]), True
+            return vehicle
+        distance, duration = self.route_matrices(vehicle)
+        order = two_opt(distance, np.arange(n_stops + 1), REPAIR_MAX_MOVES)
+        # Durakları yeni sıraya göre sakla; sonraki olaylar bu sıradan devam eder
+        vehicle.stops = vehicle.stops.subset(order[1:] - 1)
+        permutation = np.concatenate([order, np.arange(n_stops + 1, len(distance))])
+        distance = distance[np.ix_(permutation, permutation)]
+        duration = duration[np.ix_(permutation, permutation)]
+        order = np.arange(n_stops + 1)
+        station_nodes = np.arange(n_stops + 1, len(distance))
+        charging = optimal_charging_stops(order, distance, station_nodes,
+                                          energy=vehicle.vehicle_type.energy_matrix(distance),
+                                          start_charge=vehicle.battery)
+        vehicle.legs = distance[order[:-1], order[1:]]
+        vehicle.feasible = charging.feasible
+        if charging.feasible:
+            vehicle.plan = self.planner.build_plan(order, charging, distance, duration)
+        else:
+            # Şarjla bile tamamlanamıyorsa istasyonsuz sıra bildirilir; uygulanabilirlik çıktıda işaretlenir
+            vehicle.plan = self.planner.build_plan(order, ChargingPlan(feasible=False), distance, duration)
+        return vehicle
+
+    def _drop_visited(self, vehicle: LiveVehicle):
+        """Konuma ARRIVAL_RADIUS_KM içinde kalan durakları kaldırır"""
+        near = straight_line_distance(vehicle.lat, vehicle.lon, vehicle.stops.lat, vehicle.stops.lon) <= ARRIVAL_RADIUS_KM
+        if near.any():
+            vehicle.stops = vehicle.stops.subset(np.flatnonzero(~near))
+
+    def _remove_bin(self, bin_point: PointStore) -> List[LiveVehicle]:
+        affected = []
+        for vehicle in self.vehicles.values():
+            keep = ~np.all(np.isclose(vehicle.stops.coords, bin_point.coords[0]), axis=1)
+            if not keep.all():
+                vehicle.stops = vehicle.stops.subset(np.flatnonzero(keep))
+                affected.append(vehicle)
+        return affected
+
+    def _insert_bin(self, bin_point: PointStore) -> List[LiveVehicle]:
+        """Taşan konteyneri en az ek mesafeyle eklenebilecek araca ekler.
+
+        Konteyner ile tüm araçların konum ve durakları arasındaki mesafeler iki yönde bloklu tablo sorgularıyla
+        alınır; her araç için en ucuz ekleme noktası, son onarımda saklanan ayak mesafeleri üzerinden vektörel
+        bulunur.
+        Araçlar ek mesafeye göre denenir ve batarya/şarj planıyla uygulanabilir ilk araç seçilir.
+        """
+        vehicles = list(self.vehicles.values())
+        if not vehicles:
+            raise ValueError("Konteyneri atayacak araç yok")
+        for vehicle in vehicles:
+            if np.all(np.isclose(vehicle.stops.coords, bin_point.coords[0]), axis=1).any():
+                return []  # zaten bir aracın rotasında
+        nodes = np.vstack([np.vstack([[vehicle.lat, vehicle.lon], vehicle.stops.coords]) for vehicle in vehicles])
+        to_bin = get_osrm_table_blocked(nodes, bin_point.coords)[0][:, 0]
+        from_bin = get_osrm_table_blocked(bin_point.coords, nodes)[0][0]
+
+        candidates = []
+        start = 0
+        for vehicle in vehicles:
+            size = len(vehicle.stops) + 1
+            added = to_bin[start:start + size].copy()  # son durağa (ya da konuma) eklenirse
+            added[:-1] += from_bin[start + 1:start + size] - vehicle.legs
+            position = int(np.argmin(added))
+            candidates.append((float(added[position]), position, vehicle))
+            start += size
+
+        for _, position, vehicle in sorted(candidates, key=lambda candidate: candidate[0]):
+            previous = vehicle.stops
+            stops = np.arange(len(previous))
+            vehicle.stops = PointStore.concat([previous.subset(stops[:position]), bin_point,
+                                               previous.subset(stops[position:])])
+            if self.repair(vehicle).feasible:
+                return [vehicle]
+            vehicle.stops = previous
+            self.repair(vehicle)
+        # Hiçbir araç şarjla tamamlayamıyorsa en ucuz araca eklenir ve plan uygulanamaz olarak bildirilir
+        _, position, vehicle = min(candidates, key=lambda candidate: candidate[0])
+        stops = np.arange(len(vehicle.stops))
+        vehicle.stops = PointStore.concat([vehicle.stops.subset(stops[:position]), bin_point,
+                                           vehicle.stops.subset(stops[position:])])
+        return [self.repair(vehicle)]
+
+    def handle(self, event: dict) -> List[LiveVehicle]:
+        """Tek bir olayı işler; rotası onarılan araçları döndürür"""
+        if not isinstance(event, dict):
+            raise ValueError("Olay bir JSON nesnesi olmalı")
+        kind = event.get('type')
+        if kind == 'vehicle':
+            vehicle_type = VEHICLE_TYPES[event.get('vehicle_type', DEFAULT_VEHICLE_TYPE)]
+            vehicle = LiveVehicle(str(event['vehicle']), vehicle_type, float(event['lat']), float(event['lon']),
+                                  float(event.get('battery', 100.0)), self._stops(event.get('stops', [])))
+            self.vehicles[vehicle.id] = vehicle
+            affected = [vehicle]
+        elif kind == 'position':
+            vehicle = self._vehicle(event)
+            lat, lon = float(event['lat']), float(event['lon'])
+            if 'battery' in event:
+                vehicle.battery = float(event['battery'])
+            else:
+                # Batarya bildirilmediyse son konumdan bu yana yol mesafesi tahminiyle düşülür
+                travelled = road_estimator.distance(vehicle.lat, vehicle.lon, lat, lon)
+                vehicle.battery -= float(vehicle.vehicle_type.energy_matrix(travelled))
+            vehicle.lat, vehicle.lon = lat, lon
+            self._drop_visited(vehicle)
+            affected = [vehicle]
+        elif kind == 'visited':
+            vehicle = self._vehicle(event)
+            vehicle.stops = vehicle.stops.subset(np.flatnonzero(vehicle.stops.names != event.get('name')))
+            affected = [vehicle]
+        elif kind == 'bin':
+            status = str(event.get('status', '')).strip().lower()
+            if status in BIN_EMPTY_STATUSES:
+                affected = self._remove_bin(self._bin(event))
+            elif status in BIN_FULL_STATUSES:
+                return self._insert_bin(self._bin(event))
+            else:
+                raise ValueError(f"Geçersiz konteyner durumu: {event.get('status')}")
+        else:
+            raise ValueError(f"Bilinmeyen olay türü: {kind}")
+        return [self.repair(vehicle) for vehicle in affected]
+
+    def station_check(self, vehicle: LiveVehicle) -> dict:
+        """Sıradaki duraktan en yakın/yedek istasyon ve araç o durağa vardıktan sonra en yakın istasyona
+        yedek şarjı bozmadan ulaşabilir mi; tablo okuması ve son onarımın ilk ayağıyla O(1) hesaplanır"""
+        if not len(vehicle.stops) or vehicle.legs is None or not len(vehicle.legs):
+            return {}
+        index = self.locations.index_of(vehicle.stops.name(0))
+        if index < 0 or not np.allclose(self.locations.coords[index], vehicle.stops.coords[0]):
+            return {}  # konum listesinde olmayan (yeni) konteyner
+        table = self.planner.station_table
+        stations = self.planner.charging_stations
+        if table.best[index] < 0:
+            return {'station_reachable': False}
+        energy = vehicle.vehicle_type.energy_matrix(np.array([vehicle.legs[0], table.best_distance[index]]))
+        return {
+            'next_station': int(stations.ids[table.best[index]]),
+            'backup_station': int(stations.ids[table.backup[index]]) if table.backup[index] >= 0 else None,
+            'station_reachable': bool(vehicle.battery - energy.sum() >= CHARGE_RESERVE),
+        }
+
+    def describe(self, vehicle: LiveVehicle) -> dict:
+        """Aracın güncel planı: kalan durak adları, şarj istasyonu id'leri, mesafe, süre ve istasyon kontrolü"""
+        n_stops = len(vehicle.stops)
+        stations = self.planner.charging_stations
+        sequence = vehicle.plan.sequence if vehicle.plan is not None else [0]
+        return dict({
+            'vehicle': vehicle.id, 'battery': round(vehicle.battery, 2), 'feasible': vehicle.feasible,
+            'stops': [str(name) for name in vehicle.stops.names],
+            'charging': [int(stations.ids[node - n_stops - 1]) for node in sequence if node > n_stops],
+            'distance_km': round(vehicle.plan.distance, 3) if vehicle.plan is not None else 0.0,
+            'duration_s': round(vehicle.plan.duration, 1) if vehicle.plan is not None else 0.0,
+        }, **self.station_check(vehicle))
+
+    def process(self, lines):
+        """JSON satırlarını sırayla işler; her olay için güncellenen araç planlarını (ya da hatayı) üretir"""
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            started = time.perf_counter()
+            try:
+                affected = self.handle(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                yield {'event': number, 'error': str(e)}
+                continue
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            for vehicle in affected:
+                yield dict(self.describe(vehicle), event=number, repair_ms=elapsed_ms)
+
+def listen(repairer: LiveRouteRepairer, host: str = LIVE_HOST, port: int = LIVE_PORT):
+    """TCP üzerinden gelen JSON satırlarını işler; yanıtlar aynı bağlantıya ve standart çıktıya yazılır.
+
+    Bağlantılar sırayla kabul edilir; araç durumu bağlantılar arasında korunur.
+    """
+    with socket.create_server((host, port)) as server:
+        print(f"Olaylar {host}:{port} adresinden bekleniyor", file=sys.stderr)
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile('r', encoding='utf-8') as reader, \
+                    connection.makefile('w', encoding='utf-8') as writer:
+                for result in repairer.process(reader):
+                    line = json.dumps(result, ensure_ascii=False)
+                    print(line, flush=True)
+                    writer.write(line + '\n')
+                    writer.flush()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Araç konumu ve konteyner olaylarıyla canlı rota onarımı")
+    parser.add_argument('events', nargs='?', default='-', help="JSON satırları dosyası ('-' standart girdi)")
+    parser.add_argument('--listen', type=int, metavar='PORT', help="Dosya yerine bu TCP portundan olay al")
+    parser.add_argument('--host', default=LIVE_HOST)
+    parser.add_argument('--demand', default=DEMAND_FILE, help="Talep noktası dosyası (.xlsx veya .csv)")
+    parser.add_argument('--matrix-dir', default=MATRIX_DIR, help="Mesafe matrisi klasörü")
+    parser.add_argument('--osm-graph', help=OSM_GRAPH_HELP)
+    args = parser.parse_args()
+
+    use_osm_graph(args.osm_graph)
+
+    locations, errors = load_demand_points(args.demand)
+    for err in errors:
+        print(f"Satır {err.row}: {err.message}", file=sys.stderr)
+    repairer = LiveRouteRepairer(locations, DistanceMatrix.open_if_exists(args.matrix_dir))
+    if args.listen:
+        try:
+            listen(repairer, args.host, args.listen)
+        except KeyboardInterrupt:
+            pass
+    else:
+        stream = sys.stdin if args.events == '-' else open(args.events, encoding='utf-8')
+        with stream:
+            for result in repairer.process(stream):
+                print(json.dumps(result, ensure_ascii=False), flush=True)
@@ -0,0 +1,386 @@
+import hashlib
+import heapq
+import math
+import os
+import xml.etree.ElementTree as ET
+from typing import List, Tuple
+
+import numpy as np
+
+# Araç trafiğine açık yol sınıfları ve hız bilgisi olmayan yollar için varsayılan hızlar (km/sa)
+DRIVABLE_SPEEDS = {
+    'motorway': 90, 'trunk': 70, 'primary': 50, 'secondary': 50, 'tertiary': 40,
+    'unclassified': 30, 'residential': 30, 'living_street': 10, 'service': 20,
+    'motorway_link': 50, 'trunk_link': 40, 'primary_link': 40, 'secondary_link': 40, 'tertiary_link': 30,
+}
+ONEWAY_VALUES = ('yes', 'true', '1')
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Büyük daire mesafesi (km); dizilerle de çalışır"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _parse_speed(value, highway):
+    try:
+        return float(str(value).split()[0])
+    except (TypeError, ValueError):
+        return DRIVABLE_SPEEDS[highway]
+
+class RoadGraph:
+    """Yol ağını sıkıştırılmış satır (CSR) biçiminde tutan yönlü graf.
+
+    ``indptr[u]:indptr[u + 1]`` aralığı ``u`` düğümünden çıkan kenarlardır; her kenarın hedefi
+    ``indices``, uzunluğu ``length`` (km) ve süresi ``duration`` (sn) dizilerindedir.
+    """
+
+    def __init__(self, coords, indptr, indices, length, duration, node_ids=None):
+        self.coords = np.ascontiguousarray(coords, dtype=np.float64)
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.length = np.ascontiguousarray(length, dtype=np.float32)
+        self.duration = np.ascontiguousarray(duration, dtype=np.float32)
+        self.node_ids = (np.ascontiguousarray(node_ids, dtype=np.int64) if node_ids is not None
+                         else np.arange(len(self.coords), dtype=np.int64))
+
+    @property
+    def n_nodes(self):
+        return len(self.coords)
+
+    def fingerprint(self) -> str:
+        """Graf içeriğinin SHA-256 özeti; aynı ağdan üretilen graflar için aynıdır"""
+        digest = hashlib.sha256()
+        for array in (self.coords, self.indptr, self.indices, self.length, self.duration):
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, node_ids, coords, sources, targets, speeds):
+        """Kenar listesinden (düğüm indeksleri ve km/sa hızlarıyla) CSR grafı oluşturur"""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        length = haversine(coords[sources, 0], coords[sources, 1], coords[targets, 0], coords[targets, 1])
+        duration = length / np.asarray(speeds, dtype=np.float64) * 3600
+
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(coords)), out=indptr[1:])
+        return cls(coords, indptr, targets[order], length[order], duration[order], node_ids)
+
+    @classmethod
+    def _from_ways(cls, node_coords, ways):
+        """OSM düğüm koordinatları ve (düğüm listesi, hız, tek yön) yollarından graf kurar"""
+        used = sorted({ref for refs, _, _ in ways for ref in refs if ref in node_coords})
+        index = {node_id: i for i, node_id in enumerate(used)}
+        coords = np.array([node_coords[node_id] for node_id in used], dtype=np.float64).reshape(-1, 2)
+        sources, targets, speeds = [], [], []
+        for refs, speed, oneway in ways:
+            refs = [index[ref] for ref in refs if ref in index]
+            if oneway < 0:
+                refs.reverse()
+            for a, b in zip(refs, refs[1:]):
+                sources.append(a)
+                targets.append(b)
+                speeds.append(speed)
+                if not oneway:
+                    sources.append(b)
+                    targets.append(a)
+                    speeds.append(speed)
+        return cls.from_edges(used, coords, sources, targets, speeds)
+
+    @staticmethod
+    def _way_attributes(tags):
+        highway = tags.get('highway')
+        if highway not in DRIVABLE_SPEEDS or tags.get('access') in ('no', 'private'):
+            return None
+        speed = _parse_speed(tags.get('maxspeed'), highway)
+        oneway = tags.get('oneway', '')
+        if oneway == '-1':
+            direction = -1
+        elif oneway in ONEWAY_VALUES or tags.get('junction') == 'roundabout' or highway == 'motorway':
+            direction = 1
+        else:
+            direction = 0
+        return speed, direction
+
+    @classmethod
+    def from_osm_xml(cls, path):
+        """.osm (XML) dosyasını akış halinde okuyarak graf oluşturur"""
+        node_coords = {}
+        ways = []
+        for _, elem in ET.iterparse(path, events=('end',)):
+            if elem.tag == 'node':
+                node_coords[int(elem.get('id'))] = (float(elem.get('lat')), float(elem.get('lon')))
+                elem.clear()
+            elif elem.tag == 'way':
+                tags = {tag.get('k'): tag.get('v') for tag in elem.iter('tag')}
+                attributes = cls._way_attributes(tags)
+                if attributes is not None:
+                    ways.append(([int(nd.get('ref')) for nd in elem.iter('nd')], *attributes))
+                elem.clear()
+        return cls._from_ways(node_coords, ways)
+
+    @classmethod
+    def from_osm_pbf(cls, path):
+        """.osm.pbf dosyasından graf oluşturur (isteğe bağlı ``osmium`` paketini gerektirir)"""
+        try:
+            import osmium
+        except ImportError:
+            raise ImportError(".osm.pbf okumak için 'osmium' paketi gerekli (pip install osmium); "
+                              "alternatif olarak .osm veya .npz graf dosyası kullanın")
+
+        graph_class = cls
+
+        class _Handler(osmium.SimpleHandler):
+            def __init__(self):
+                super().__init__()
+                self.node_coords = {}
+                self.ways = []
+
+            def node(self, n):
+                self.node_coords[n.id] = (n.location.lat, n.location.lon)
+
+            def way(self, w):
+                attributes = graph_class._way_attributes({tag.k: tag.v for tag in w.tags})
+                if attributes is not None:
+                    self.ways.append(([nd.ref for nd in w.nodes], *attributes))
+
+        handler = _Handler()
+        handler.apply_file(path)
+        return cls._from_ways(handler.node_coords, handler.ways)
+
+    def save(self, path):
+        np.savez_compressed(path, coords=self.coords, indptr=self.indptr, indices=self.indices,
+                            length=self.length, duration=self.duration, node_ids=self.node_ids)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['coords'], data['indptr'], data['indices'], data['length'], data['duration'],
+                       data['node_ids'])
+
+    def largest_component(self) -> np.ndarray:
+        """En büyük güçlü bağlantılı bileşenin düğüm indeksleri; bu düğümler arasında her yönde yol vardır"""
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        if not self.n_nodes:
+            return np.empty(0, dtype=np.int64)
+        adjacency = csr_matrix((np.ones(self.n_edges, dtype=np.int8), self.indices, self.indptr),
+                               shape=(self.n_nodes, self.n_nodes))
+        _, labels = connected_components(adjacency, directed=True, connection='strong')
+        return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+
+    def reversed(self):
+        """Ters graf için (indptr, kaynak düğümler, ileri graftaki kenar indeksleri) üçlüsü"""
+        sources = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind='stable')
+        indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.n_nodes), out=indptr[1:])
+        return indptr, sources[order], order
+
+def load_road_graph(path) -> RoadGraph:
+    """Uzantıya göre .npz, .osm veya .osm.pbf dosyasından yol grafı yükler"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' dosyası bulunamadı!")
+    lower = path.lower()
+    if lower.endswith('.npz'):
+        return RoadGraph.load(path)
+    if lower.endswith('.pbf'):
+        return RoadGraph.from_osm_pbf(path)
+    return RoadGraph.from_osm_xml(path)
+
+class LocalRoutingEngine:
+    """Yerel yol grafı üzerinde OSRM yerine kullanılabilen rota motoru.
+
+    Noktalar yalnızca en büyük güçlü bağlantılı bileşendeki en yakın düğüme bağlanır; böylece ağdan kopuk
+    parçalara düşen noktalar ulaşılamaz (sonsuz) sonuç üretmez. Nokta ile düğüm arasındaki bağlantı kuş
+    uçuşu eklenir.
+    Tekil sorgular çift yönlü Dijkstra, tablo sorguları kaynak başına tek Dijkstra ile (tüm hedefler
+    yerleşince durarak) süreye göre en kısa yolu bulur.
+    """
+
+    def __init__(self, graph: RoadGraph, access_speed_kmh: float = 15.0):
+        self.graph = graph
+        self.access_speed_kmh = access_speed_kmh
+        self._identity = None
+        self._cos_lat = math.cos(math.radians(float(np.mean(graph.coords[:, 0])))) if graph.n_nodes else 1.0
+        self._snap_cache = {}
+        self._snap_nodes = graph.largest_component()
+        self._snap_coords = graph.coords[self._snap_nodes]
+        # Sorgu sırasında Python listeleri NumPy skaler erişiminden çok daha hızlıdır
+        self._forward = (graph.indptr.tolist(), graph.indices.tolist(), graph.duration.tolist(),
+                         graph.length.tolist())
+        self._edge_sources = np.repeat(np.arange(graph.n_nodes, dtype=np.int32), np.diff(graph.indptr))
+        rev_indptr, rev_sources, rev_edges = graph.reversed()
+        self._backward = (rev_indptr.tolist(), rev_sources.tolist(), graph.duration[rev_edges].tolist(),
+                          rev_edges.tolist())
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_road_graph(path))
+
+    def identity(self) -> dict:
+        """Sonuçları belirleyen motor kimliği (önbellek anahtarları için); graf özeti bir kez hesaplanır"""
+        if self._identity is None:
+            self._identity = {'engine': 'osm', 'graph': self.graph.fingerprint(),
+                              'access_speed_kmh': self.access_speed_kmh}
+        return self._identity
+
+    def nearest_node(self, lat, lon) -> int:
+        key = (round(lat, 6), round(lon, 6))
+        node = self._snap_cache.get(key)
+        if node is None:
+            coords = self._snap_coords
+            nearest = np.argmin((coords[:, 0] - lat) ** 2 + ((coords[:, 1] - lon) * self._cos_lat) ** 2)
+            node = self._snap_cache[key] = int(self._snap_nodes[nearest])
+        return node
+
+    def _access(self, lat, lon, node):
+        distance = float(haversine(lat, lon, *self.graph.coords[node]))
+        return distance, distance / self.access_speed_kmh * 3600
+
+    def _dijkstra(self, source, targets):
+        """Kaynaktan süreye göre Dijkstra; tüm hedefler yerleşince durur. {düğüm: (sn, km)} döner"""
+        indptr, indices, duration, length = self._forward
+        remaining = set(targets)
+        best = {source: 0.0}
+        km = {source: 0.0}
+        settled = {}
+        heap = [(0.0, source)]
+        while heap and remaining:
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled[u] = (d, km[u])
+            remaining.discard(u)
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = d + duration[e]
+                if nd < best.get(v, math.inf):
+                    best[v] = nd
+                    km[v] = km[u] + length[e]
+                    heapq.heappush(heap, (nd, v))
+        return {target: settled.get(target, (math.inf, math.inf)) for target in targets}
+
+    def shortest_path(self, source: int, target: int) -> Tuple[float, float, List[int]]:
+        """Çift yönlü Dijkstra ile (süre sn, mesafe km, düğüm yolu)"""
+        if source == target:
+            return 0.0, 0.0, [source]
+        f_indptr, f_indices, f_duration, _ = self._forward
+        b_indptr, b_sources, b_duration, b_edges = self._backward
+        dist = ({source: 0.0}, {target: 0.0})
+        pred = ({source: -1}, {target: -1})  # ileri graftaki kenar indeksleri
+        settled = (set(), set())
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meeting = math.inf, -1
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            if side == 0:
+                edges = ((e, f_indices[e], f_duration[e]) for e in range(f_indptr[u], f_indptr[u + 1]))
+            else:
+                edges = ((b_edges[e], b_sources[e], b_duration[e]) for e in range(b_indptr[u], b_indptr[u + 1]))
+            own, other = dist[side], dist[1 - side]
+            for edge, v, w in edges:
+                nd = d + w
+                if nd < own.get(v, math.inf):
+                    own[v] = nd
+                    pred[side][v] = edge
+                    heapq.heappush(heaps[side], (nd, v))
+                if v in other and nd + other[v] < best:
+                    best, meeting = nd + other[v], v
+
+        if meeting < 0:
+            return math.inf, math.inf, []
+
+        path = [meeting]
+        while pred[0][path[-1]] >= 0:
+            path.append(int(self._edge_sources[pred[0][path[-1]]]))
+        path.reverse()
+        path_edges = [pred[0][node] for node in path[1:]]
+        node = meeting
+        while pred[1][node] >= 0:
+            edge = pred[1][node]
+            path_edges.append(edge)
+            node = f_indices[edge]
+            path.append(node)
+        return best, float(self.graph.length[path_edges].sum()), path
+
+    def route(self, lat1, lon1, lat2, lon2):
+        """İki koordinat arasındaki (mesafe km, süre sn, geometri) sonucu; geometri (N, 2) (enlem, boylam) dizisi"""
+        source, target = self.nearest_node(lat1, lon1), self.nearest_node(lat2, lon2)
+        seconds, km, path = self.shortest_path(source, target)
+        if not path:
+            return math.inf, math.inf, np.array([[lat1, lon1], [lat2, lon2]], dtype=np.float64)
+        start_km, start_s = self._access(lat1, lon1, source)
+        end_km, end_s = self._access(lat2, lon2, target)
+        geometry = np.empty((len(path) + 2, 2), dtype=np.float64)
+        geometry[0], geometry[-1] = (lat1, lon1), (lat2, lon2)
+        geometry[1:-1] = self.graph.coords[path]
+        return km + start_km + end_km, seconds + start_s + end_s, geometry
+
+    def distance(self, lat1, lon1, lat2, lon2) -> float:
+        return self.route(lat1, lon1, lat2, lon2)[0]
+
+    def route_geometry(self, lat1, lon1, lat2, lon2):
+        return self.route(lat1, lon1, lat2, lon2)[2]
+
+    def table(self, sources, destinations):
+        """Kaynak ve hedef koordinatları arasındaki mesafe (km) ve süre (sn) matrisleri"""
+        sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        source_nodes = [self.nearest_node(lat, lon) for lat, lon in sources]
+        target_nodes = [self.nearest_node(lat, lon) for lat, lon in destinations]
+        source_access = [self._access(lat, lon, node) for (lat, lon), node in zip(sources, source_nodes)]
+        target_access = [self._access(lat, lon, node) for (lat, lon), node in zip(destinations, target_nodes)]
+
+        distance = np.empty((len(sources), len(destinations)))
+        duration = np.empty_like(distance)
+        unique_targets = list(dict.fromkeys(target_nodes))
+        for i, source in enumerate(source_nodes):
+            reached = self._dijkstra(source, unique_targets)
+            for j, target in enumerate(target_nodes):
+                seconds, km = reached[target]
+                distance[i, j] = km + source_access[i][0] + target_access[j][0]
+                duration[i, j] = seconds + source_access[i][1] + target_access[j][1]
+        same = (np.asarray(source_nodes)[:, None] == np.asarray(target_nodes)[None, :])
+        if same.any():
+            # Aynı düğüme bağlanan noktalar arasında doğrudan kuş uçuşu bağlantı
+            direct = haversine(sources[:, :1], sources[:, 1:], destinations[:, 0], destinations[:, 1])
+            distance[same] = direct[same]
+            duration[same] = direct[same] / self.access_speed_kmh * 3600
+        return distance, duration
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Yerel yol ağı rota motoru")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert', help=".osm/.osm.pbf dosyasını sıkıştırılmış .npz grafa dönüştür")
+    convert.add_argument('source')
+    convert.add_argument('target')
+    query = subparsers.add_parser('query', help="İki koordinat arasında rota hesapla")
+    query.add_argument('graph')
+    query.add_argument('coords', nargs=4, type=float, metavar=('LAT1', 'LON1', 'LAT2', 'LON2'))
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        graph = load_road_graph(args.source)
+        graph.save(args.target)
+        print(f"{graph.n_nodes} düğüm, {graph.n_edges} kenar -> {args.target}")
+    else:
+        engine = LocalRoutingEngine.from_file(args.graph)
+        km, seconds, geometry = engine.route(*args.coords)
+        print(f"{km:.3f} km, {seconds / 60:.1f} dk, {len(geometry)} geometri noktası")
@@ -0,0 +1,187 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import arp
+from osm_router import LocalRoutingEngine
+
+# Sabit örnekler fixtures/mini_network.osm yol ağı içinde tohumlu olarak üretilir ve OSRM yerine yerel rota
+# motoruyla (ağ erişimi olmadan) çözülür. Rota sorgusu sayısı ve tur uzunluğu perf_baselines.json
+# dosyasındaki değerlerle karşılaştırılır; tolerans aşılırsa çıkış kodu 1 olur. Süreler makineden makineye
+# değiştiği için aynı çalıştırmada ölçülen, çözücüye dokunmayan sabit bir kalibrasyon iş yüküne oranlanır;
+# ölçeklenmiş süre aşımı da gerileme sayılır (--no-time ile yalnızca uyarı verilir).
+#
+#     python perf_regression.py                 # karşılaştır
+#     python perf_regression.py --no-time       # süre aşımını yalnızca uyarı olarak yazdır
+#     python perf_regression.py --update        # mevcut sonuçları yeni temel değer olarak kaydet
+NETWORK_FILE = os.path.join('fixtures', 'mini_network.osm')
+BASELINE_FILE = 'perf_baselines.json'
+NETWORK_BOUNDS = ((37.755, 37.785), (30.525, 30.555))  # (enlem, boylam) aralıkları
+
+# ad -> (nokta sayısı, örnek tohumu)
+INSTANCES = {
+    'kucuk_10': (10, 1),
+    'orta_25': (25, 2),
+    'buyuk_40': (40, 3),
+}
+
+TIME_TOLERANCE = 0.5  # temel süreden en fazla %50 yavaş
+TIME_SLACK = 0.2  # saniye; çok kısa süren örneklerde ölçüm gürültüsü için
+DISTANCE_TOLERANCE = 0.005  # tur uzunluğu en fazla %0,5 kötüleşebilir
+CALL_TOLERANCE = 0  # rota sorgusu sayısı artmamalı
+CALIBRATION_KEY = '_kalibrasyon_sn'  # temel değer dosyasında kalibrasyon iş yükünün süresi
+CALIBRATION_SIZE = 200  # kalibrasyon iş yükündeki matris boyutu
+CALIBRATION_ROUNDS = 2000
+
+def make_instance(n_points: int, seed: int) -> arp.PointStore:
+    rng = np.random.default_rng(seed)
+    (lat_min, lat_max), (lon_min, lon_max) = NETWORK_BOUNDS
+    coords = np.column_stack([rng.uniform(lat_min, lat_max, n_points), rng.uniform(lon_min, lon_max, n_points)])
+    return arp.PointStore(np.arange(1, n_points + 1), coords, [f'Nokta {i}' for i in range(1, n_points + 1)])
+
+def measure(points: arp.PointStore, repeat: int, seed=arp.RANDOM_SEED) -> dict:
+    """Örneği ``repeat`` kez baştan çözer; en kısa süreyi, sorgu sayısını ve tur uzunluğunu döndürür"""
+    times, distances, calls = [], set(), set()
+    for _ in range(repeat):
+        arp.routing_calls.clear()
+        started = time.perf_counter()
+        planner = arp.RoutePlanner(points, arp.place_charging_stations(points, seed=seed), seed=seed)
+        plan = planner.plan_route(points)
+        times.append(time.perf_counter() - started)
+        distances.add(round(plan.distance, 6))
+        calls.add(sum(arp.routing_calls.values()))
+    if len(distances) > 1 or len(calls) > 1:
+        raise RuntimeError(f"Aynı tohumla farklı sonuçlar alındı: {sorted(distances)} km, {sorted(calls)} sorgu")
+    return {'seconds': min(times), 'routing_calls': calls.pop(), 'distance_km': distances.pop()}
+
+def check_table_fallback(factor: float = 2.0) -> list:
+    """OSRM'ye ulaşılamadığında table sonuçları kalibre edilmiş yol katsayısını kullanmalı.
+
+    Tahminci ``factor`` oranlı örneklerle beslenir, devre kesici açılır ve rota motoru kapatılır;
+    orijinal durum sonunda geri yüklenir.
+    """
+    points = make_instance(6, 99)
+    coords = points.coords
+    straight = arp.straight_line_distance(coords[:, None, 0], coords[:, None, 1], coords[:, 0], coords[:, 1])
+    off_diagonal = ~np.eye(len(coords), dtype=bool)
+    saved = arp.road_estimator, arp.osrm_breaker, arp._routing_backend
+    try:
+        arp.road_estimator = arp.RoadDistanceEstimator()
+        arp.road_estimator.observe(straight[off_diagonal], straight[off_diagonal] * factor,
+                                   straight[off_diagonal] / 40.0 * 3600)
+        arp.osrm_breaker = arp.CircuitBreaker()
+        arp.osrm_breaker.opened_at = time.monotonic()
+        arp.set_routing_backend(None)
+        distance, _ = arp.get_osrm_table(coords, coords)
+    finally:
+        arp.road_estimator, arp.osrm_breaker = saved[:2]
+        arp.set_routing_backend(saved[2])
+    ratio = float(np.median(distance[off_diagonal] / straight[off_diagonal]))
+    if abs(ratio - factor) > 1e-6:
+        return [f"yedek table tahmini: yol katsayısı {ratio:.3f}, beklenen {factor:.3f}"]
+    return []
+
+def _calibration_workload(distance, tours):
+    # Çözücü koduna dokunmaz: NumPy dizi okumaları ve saf Python döngüleriyle sabit miktarda iş
+    total = 0.0
+    for tour in tours:
+        total += float(distance[tour[:-1], tour[1:]].sum())
+        best = tour.tolist()
+        for i in range(1, len(best) - 1):
+            a, b, c = best[i - 1], best[i], best[i + 1]
+            if distance[a, c] < distance[a, b] + distance[b, c]:
+                total += 1.0
+    return total
+
+def calibrate(repeat: int) -> float:
+    """Çözücüden bağımsız sabit iş yükünün en kısa süresi (sn); süreler bu değere oranlanır.
+
+    İş yükü çözücüyü çağırmaz; aksi hâlde çözücüdeki bir yavaşlama kalibrasyonu da yavaşlatıp gerilemeyi gizlerdi.
+    """
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0, 10, (CALIBRATION_SIZE, 2))
+    distance = np.sqrt(((coords[:, None] - coords[None]) ** 2).sum(axis=-1))
+    tours = [rng.permutation(CALIBRATION_SIZE) for _ in range(CALIBRATION_ROUNDS)]
+    times = []
+    for _ in range(max(repeat, 5)):
+        started = time.perf_counter()
+        _calibration_workload(distance, tours)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def compare_time(name: str, result: dict, baseline: dict, scale: float = 1.0) -> list:
+    """Temel süre ``scale`` (bu makinenin kalibrasyon süresi / temel değerlerinki) ile ölçeklenerek karşılaştırılır"""
+    time_limit = baseline['seconds'] * scale * (1 + TIME_TOLERANCE) + TIME_SLACK
+    if result['seconds'] > time_limit:
+        return [f"{name}: süre {result['seconds']:.3f} sn > {time_limit:.3f} sn (ölçek {scale:.2f})"]
+    return []
+
+def compare(name: str, result: dict, baseline: dict) -> list:
+    """Belirlenimci ölçümlerde (rota sorgusu sayısı, tur uzunluğu) toleransı aşanlar için hata mesajları"""
+    failures = []
+    if result['routing_calls'] > baseline['routing_calls'] + CALL_TOLERANCE:
+        failures.append(f"{name}: rota sorgusu {result['routing_calls']} > {baseline['routing_calls']}")
+    distance_limit = baseline['distance_km'] * (1 + DISTANCE_TOLERANCE)
+    if result['distance_km'] > distance_limit + 1e-9:
+        failures.append(f"{name}: tur uzunluğu {result['distance_km']:.3f} km > {distance_limit:.3f} km")
+    return failures
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Performans ve kalite gerileme testi")
+    parser.add_argument('--update', action='store_true', help="Sonuçları temel değer olarak kaydet")
+    parser.add_argument('--repeat', type=int, default=3, help="Örnek başına tekrar sayısı (en kısa süre alınır)")
+    parser.add_argument('--baselines', default=BASELINE_FILE)
+    parser.add_argument('--only', nargs='*', choices=sorted(INSTANCES), help="Yalnızca bu örnekleri çalıştır")
+    parser.add_argument('--no-time', action='store_true', help="Süre aşımını gerileme sayma, yalnızca uyar")
+    args = parser.parse_args(argv)
+
+    arp.set_routing_backend(LocalRoutingEngine.from_file(NETWORK_FILE))
+    try:
+        with open(args.baselines, encoding='utf-8') as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+
+    calibration = calibrate(args.repeat)
+    results, measured, failures = {}, [], check_table_fallback()
+    for name in args.only or INSTANCES:
+        n_points, seed = INSTANCES[name]
+        results[name] = result = measure(make_instance(n_points, seed), args.repeat)
+        print(f"{name:10s} {result['seconds']:7.3f} sn  {result['routing_calls']:4d} sorgu  "
+              f"{result['distance_km']:8.3f} km")
+        if not args.update:
+            if name in baselines:
+                failures.extend(compare(name, result, baselines[name]))
+                measured.append(name)
+            else:
+                print(f"  {name} için temel değer yok (--update ile kaydedin)")
+
+    # Örneklerden önce ve sonra ölçülen kalibrasyonun kısası alınır; anlık yük dalgalanmaları azalır
+    calibration = min(calibration, calibrate(args.repeat))
+    scale = calibration / baselines[CALIBRATION_KEY] if CALIBRATION_KEY in baselines else 1.0
+    print(f"kalibrasyon {calibration:7.3f} sn  (temel değerlere göre ölçek {scale:.2f})")
+    slow = [message for name in measured for message in compare_time(name, results[name], baselines[name], scale)]
+
+    if args.update:
+        baselines.update(results)
+        baselines[CALIBRATION_KEY] = calibration
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Temel değerler '{args.baselines}' dosyasına yazıldı")
+        return 0
+    if args.no_time:
+        for message in slow:
+            print(f"UYARI: {message}")
+    else:
+        failures.extend(slow)
+    for failure in failures:
+        print(f"GERİLEME: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
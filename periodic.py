@@ -0,0 +1,179 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from arp import (BATCH_PROFILE_HELP, DEMAND_FILE, MATRIX_DIR, OSM_GRAPH_HELP, DistanceMatrix, PointStore, RoutePlan,
+                 RoutePlanner, SharedArrays, load_demand_points, place_charging_stations, profiled_if, use_osm_graph)
+from station_sweep import location_matrix
+
+PLANNING_DAYS = 7  # planlama ufku (gün)
+PERIOD_COLUMNS = ('Mahalleler', 'Periyot')
+PERIOD_NAMES = {'günlük': 1, 'gunluk': 1, 'gün aşırı': 2, 'gun asiri': 2, 'haftalık': 7, 'haftalik': 7}
+
+def read_periods(path: str) -> Dict[str, int]:
+    """Mahalle -> toplama periyodu (gün) eşlemesini xlsx/csv dosyasından okur.
+
+    Periyot sütunu gün sayısı ya da 'günlük', 'gün aşırı', 'haftalık' olabilir.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' dosyası bulunamadı!")
+    frame = pd.read_csv(path, dtype=object) if path.lower().endswith('.csv') else pd.read_excel(path, dtype=object)
+    missing = [col for col in PERIOD_COLUMNS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"'{path}' dosyasında gerekli sütunlar ({', '.join(missing)}) bulunamadı!")
+
+    periods = {}
+    for row_number, (name, value) in enumerate(zip(frame['Mahalleler'], frame['Periyot']), start=2):
+        key = str(value).strip().lower()
+        period = PERIOD_NAMES.get(key)
+        if period is None:
+            try:
+                period = int(float(key))
+            except ValueError:
+                raise ValueError(f"Satır {row_number}: geçersiz periyot değeri {value!r}")
+        if period < 1:
+            raise ValueError(f"Satır {row_number}: periyot en az 1 gün olmalı")
+        periods[str(name).strip()] = period
+    return periods
+
+def assign_days(periods, n_days: int = PLANNING_DAYS) -> List[np.ndarray]:
+    """Noktaları periyotlarına göre günlere dağıtır ve günlük nokta sayılarını dengeler.
+
+    Periyodu p olan nokta için başlangıç günü o seçilir ve nokta o, o+p, o+2p, ... günlerinde ziyaret
+    edilir. Esnekliği en az olan (kısa periyotlu) noktalar önce yerleştirilir; her nokta ziyaret
+    günlerindeki en büyük yükü en az artıran başlangıç gününe konur. Döndürülen liste her gün için
+    nokta indekslerini içerir.
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    load = np.zeros(n_days, dtype=np.int64)
+    days = [[] for _ in range(n_days)]
+    for index in np.argsort(periods, kind='stable'):
+        period = min(int(periods[index]), n_days)
+        best = None
+        for offset in range(period):
+            visits = np.arange(offset, n_days, period)
+            score = (load[visits].max(), load[visits].sum(), offset)
+            if best is None or score < best[0]:
+                best = (score, visits)
+        load[best[1]] += 1
+        for day in best[1]:
+            days[day].append(int(index))
+    return [np.asarray(sorted(day), dtype=np.intp) for day in days]
+
+# Her çalışan süreçte bir kez kurulan planlayıcı; matris ve istasyon yerleşimi tüm günlerce paylaşılır
+_worker_planner = None
+
+def _init_worker(locations: PointStore, stations: PointStore, shared_matrix: SharedArrays = None,
+                 osm_graph: str = None):
+    global _worker_planner
+    _worker_planner = RoutePlanner.for_worker(locations, stations, shared_matrix, osm_graph)
+
+def _solve_day(points: PointStore):
+    started = time.perf_counter()
+    plan = _worker_planner.plan_route(points)
+    return plan, time.perf_counter() - started
+
+def planning_matrix(locations: PointStore, stations: PointStore, matrix_dir: str = MATRIX_DIR) -> DistanceMatrix:
+    """Konum ve istasyonların tümünü kapsayan matris: kayıtlı matris yeterliyse o açılır, değilse konumlar
+    arası blok ``location_matrix`` ile alınıp istasyon satır ve sütunları bir kez eklenir"""
+    matrix = DistanceMatrix.open_if_exists(matrix_dir)
+    if (matrix is not None and (matrix.location_indexes(locations) >= 0).all()
+            and (matrix.station_indexes(stations) >= 0).all()):
+        return matrix
+    return location_matrix(locations, matrix_dir).with_stations(stations)
+
+class PeriodicPlanner:
+    """Haftalık (çok günlü) toplama planı: noktaları günlere atar ve her günü ayrı süreçte çözer.
+
+    Depo (başlangıç noktası) her günün rotasına ilk nokta olarak eklenir. Konum ve istasyon matrisi ana
+    süreçte bir kez hazırlanır (kayıtlı değilse hesaplanır), çözüm boyunca paylaşımlı belleğe yazılır ve
+    süreçler ona kopyalamadan bağlanır; böylece hiçbir süreç kendi başına rota sorgusu yapmaz.
+    """
+
+    def __init__(self, locations: PointStore, depot: int = 0, stations: PointStore = None,
+                 matrix_dir: str = MATRIX_DIR, n_days: int = PLANNING_DAYS, workers: int = None,
+                 osm_graph: str = None):
+        self.locations = locations
+        self.depot = depot
+        self.matrix_dir = matrix_dir
+        self.n_days = n_days
+        self.workers = workers or min(n_days, os.cpu_count() or 1)
+        self.osm_graph = osm_graph
+        self.stations = stations if stations is not None else place_charging_stations(locations)
+        self.planner = RoutePlanner(locations, self.stations,
+                                    matrix=planning_matrix(locations, self.stations, matrix_dir))
+
+    def day_points(self, periods) -> List[PointStore]:
+        """Her gün için depo + o gün toplanacak noktalar"""
+        customers = np.delete(np.arange(len(self.locations)), self.depot)
+        days = assign_days(np.asarray(periods)[customers], self.n_days)
+        return [self.locations.subset(np.concatenate([[self.depot], customers[day]])) for day in days]
+
+    def solve(self, periods):
+        """Günlük rotaları paralel olarak hesaplar; (günlük noktalar, günlük planlar) döner, boş günlerin planı None"""
+        day_points = self.day_points(periods)
+        plans: List[RoutePlan] = [None] * self.n_days
+        busy = [day for day, points in enumerate(day_points) if len(points) > 1]
+        shared = self.planner.matrix.share()
+        initargs = (self.locations, self.stations, shared, self.osm_graph)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                for day, (plan, seconds) in zip(busy, pool.map(_solve_day, [day_points[day] for day in busy])):
+                    plans[day] = plan
+                    print(f"Gün {day + 1}: {len(day_points[day]) - 1} nokta, {plan.distance:.2f} km "
+                          f"({seconds:.1f} sn)")
+        finally:
+            shared.close()
+        return day_points, plans
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Çok günlü periyodik atık toplama planı")
+    parser.add_argument('--demand', default=DEMAND_FILE, help="Talep noktası dosyası (.xlsx veya .csv)")
+    parser.add_argument('--periods', help="Mahalleler ve Periyot sütunlarını içeren dosya (.xlsx veya .csv)")
+    parser.add_argument('--default-period', type=int, default=1,
+                        help="Periyot dosyasında bulunmayan mahallelerin periyodu (gün)")
+    parser.add_argument('--days', type=int, default=PLANNING_DAYS, help="Planlama ufku (gün)")
+    parser.add_argument('--depot', help="Başlangıç mahallesi (varsayılan: dosyadaki ilk mahalle)")
+    parser.add_argument('--matrix-dir', default=MATRIX_DIR, help="Mesafe matrisi klasörü")
+    parser.add_argument('--workers', type=int, help="Paralel çözücü süreç sayısı")
+    parser.add_argument('--export', help="Günlük rotaları yaz (geojson, npz, csv; virgülle ayrılmış)")
+    parser.add_argument('--output', default='rota', help="Çıktı dosyalarının ön eki (ör. rota_gun1.csv)")
+    parser.add_argument('--html', action='store_true', help="Her gün için HTML harita oluştur")
+    parser.add_argument('--osm-graph', help=OSM_GRAPH_HELP)
+    parser.add_argument('--profile', metavar='PREFIX', help=BATCH_PROFILE_HELP)
+    args = parser.parse_args()
+
+    use_osm_graph(args.osm_graph)
+
+    locations, errors = load_demand_points(args.demand)
+    for err in errors:
+        print(f"Satır {err.row}: {err.message}")
+    periods = read_periods(args.periods) if args.periods else {}
+    locations.attrs['period'] = np.array([periods.get(name, args.default_period) for name in locations.names])
+    depot = locations.index_of(args.depot) if args.depot else 0
+    if depot < 0:
+        raise SystemExit(f"Bilinmeyen mahalle: {args.depot}")
+
+    planner = PeriodicPlanner(locations, depot, matrix_dir=args.matrix_dir, n_days=args.days, workers=args.workers,
+                              osm_graph=args.osm_graph)
+    started = time.perf_counter()
+    with profiled_if(args.profile):
+        day_points, plans = planner.solve(locations.attrs['period'])
+    print(f"{args.days} günlük plan {time.perf_counter() - started:.1f} sn içinde hesaplandı, toplam "
+          f"{sum(plan.distance for plan in plans if plan is not None):.2f} km")
+
+    export_formats = [fmt.strip() for fmt in args.export.split(',')] if args.export else []
+    if export_formats or args.html:
+        for day, (points, plan) in enumerate(zip(day_points, plans), start=1):
+            if plan is None:
+                continue
+            for fmt in export_formats:
+                planner.planner.export_route(points, plan, f"{args.output}_gun{day}.{fmt}", fmt)
+            if args.html:
+                planner.planner.render_route(points, plan, f"{args.output}_gun{day}.html")
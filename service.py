@@ -0,0 +1,257 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from arp import (DEMAND_FILE, MATRIX_DIR, OSM_GRAPH_HELP, DistanceMatrix, PointStore, RoutePlanner, SharedArrays,
+                 load_demand_points, use_osm_graph)
+
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+JOB_QUEUE_SIZE = 32  # kuyruk doluysa yeni işler 503 ile reddedilir
+JOB_HISTORY = 1000  # bellekte tutulan en fazla tamamlanmış iş
+LATENCY_WINDOW = 500  # gecikme istatistikleri için son iş sayısı
+MAX_REQUEST_BYTES = 1 << 20
+
+# Her çözücü süreçte bir kez kurulur; matris, istasyon yerleşimi ve OSRM çift önbelleği istekler arasında sıcak kalır
+_worker_planner = None
+
+def _init_worker(locations: PointStore, stations: PointStore, shared_matrix: SharedArrays = None,
+                 osm_graph: str = None):
+    global _worker_planner
+    _worker_planner = RoutePlanner.for_worker(locations, stations, shared_matrix, osm_graph)
+
+def _solve_job(points: PointStore) -> dict:
+    started = time.perf_counter()
+    plan = _worker_planner.plan_route(points)
+    stops = [dict(zip(('sira', 'tur', 'id', 'ad', 'enlem', 'boylam', 'mesafe_km'), row))
+             for row in _worker_planner.stop_rows(points, plan)]
+    return {'distance_km': plan.distance, 'duration_s': plan.duration, 'sequence': plan.sequence,
+            'stops': stops, 'solve_s': time.perf_counter() - started}
+
+class Job:
+    __slots__ = ('id', 'points', 'status', 'error', 'result', 'submitted', 'started', 'finished')
+
+    def __init__(self, job_id: str, points: PointStore):
+        self.id = job_id
+        self.points = points
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.error = None
+        self.result = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def summary(self) -> dict:
+        info = {'id': self.id, 'status': self.status, 'n_points': len(self.points), 'submitted': self.submitted}
+        if self.started is not None:
+            info['queue_wait_s'] = self.started - self.submitted
+        if self.finished is not None:
+            info['latency_s'] = self.finished - self.submitted
+        if self.error:
+            info['error'] = self.error
+        return info
+
+class RoutingService:
+    """Sınırlı iş kuyruğu ve sıcak çözücü süreç havuzu.
+
+    Her çözücü süreç için bir dağıtıcı iş parçacığı kuyruktan iş alıp havuza gönderir; böylece
+    kuyruk derinliği henüz başlamamış iş sayısını doğrudan gösterir. Mesafe matrisi servis açıkken
+    paylaşımlı bellekte tutulur ve ``shutdown`` ile serbest bırakılır.
+    """
+
+    def __init__(self, locations: PointStore, matrix_dir: str = MATRIX_DIR, workers: int = None,
+                 queue_size: int = JOB_QUEUE_SIZE, osm_graph: str = None):
+        self.locations = locations
+        self.workers = workers or os.cpu_count() or 1
+        planner = RoutePlanner(locations, matrix=DistanceMatrix.open_if_exists(matrix_dir))
+        self.shared_matrix = planner.matrix.share() if planner.matrix is not None else None
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(locations, planner.charging_stations, self.shared_matrix, osm_graph))
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {'submitted': 0, 'rejected': 0, 'done': 0, 'failed': 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.running = 0
+        self._ids = itertools.count(1)
+        self._dispatchers = [threading.Thread(target=self._dispatch, daemon=True) for _ in range(self.workers)]
+        for thread in self._dispatchers:
+            thread.start()
+
+    def parse_points(self, payload) -> PointStore:
+        """İstekteki noktaları okur: mahalle adları ya da {name, lat, lon} nesneleri; ilk nokta başlangıçtır"""
+        items = payload.get('points') if isinstance(payload, dict) else None
+        if not isinstance(items, list) or len(items) < 2:
+            raise ValueError("'points' en az iki nokta içeren bir liste olmalı")
+        ids, names, coords = [], [], []
+        for i, item in enumerate(items):
+            if isinstance(item, str):
+                index = self.locations.index_of(item)
+                if index < 0:
+                    raise ValueError(f"Bilinmeyen mahalle: {item}")
+                names.append(item)
+                coords.append(self.locations.coord(index))
+            elif isinstance(item, dict) and 'lat' in item and 'lon' in item:
+                try:
+                    lat, lon = float(item['lat']), float(item['lon'])
+                except (TypeError, ValueError):
+                    raise ValueError(f"{i + 1}. nokta için lat/lon sayı olmalı") from None
+                if not (abs(lat) <= 90 and abs(lon) <= 180):
+                    raise ValueError(f"{i + 1}. nokta için geçersiz koordinat")
+                names.append(str(item.get('name', f'Nokta {i + 1}')))
+                coords.append((lat, lon))
+            else:
+                raise ValueError(f"{i + 1}. nokta mahalle adı ya da lat/lon içeren nesne olmalı")
+            ids.append(i + 1)
+        return PointStore(ids, coords, names)
+
+    def submit(self, points: PointStore) -> Job:
+        """İşi kuyruğa ekler; kuyruk doluysa queue.Full yükseltir"""
+        job = Job(str(next(self._ids)), points)
+        with self.lock:
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                self.counters['rejected'] += 1
+                raise
+            self.counters['submitted'] += 1
+            self.jobs[job.id] = job
+            while len(self.jobs) > JOB_HISTORY and next(iter(self.jobs.values())).status in ('done', 'failed'):
+                self.jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _dispatch(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            with self.lock:
+                job.status, job.started = 'running', time.time()
+                self.running += 1
+            try:
+                result, error = self.pool.submit(_solve_job, job.points).result(), None
+            except Exception as e:
+                result, error = None, str(e)
+            with self.lock:
+                job.finished = time.time()
+                job.result, job.error = result, error
+                job.status = 'failed' if error else 'done'
+                self.running -= 1
+                self.counters[job.status] += 1
+                self.latencies.append((job.started - job.submitted, job.finished - job.started,
+                                       job.finished - job.submitted))
+
+    def metrics(self) -> dict:
+        with self.lock:
+            latencies = np.array(self.latencies, dtype=np.float64).reshape(-1, 3)
+            info = dict(self.counters, queue_depth=self.queue.qsize(), queue_size=self.queue.maxsize,
+                        running=self.running, workers=self.workers)
+        for column, name in enumerate(('queue_wait_s', 'solve_s', 'latency_s')):
+            values = latencies[:, column]
+            info[name] = ({'p50': float(np.percentile(values, 50)), 'p95': float(np.percentile(values, 95)),
+                           'max': float(values.max())} if len(values) else None)
+        return info
+
+    def shutdown(self):
+        for _ in self._dispatchers:
+            self.queue.put(None)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.shared_matrix is not None:
+            self.shared_matrix.close()
+
+class RoutingRequestHandler(BaseHTTPRequestHandler):
+    """POST /jobs, GET /jobs/<id>, GET /jobs/<id>/result, GET /metrics"""
+
+    service: RoutingService = None
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            return self._send(404, {'error': 'Bulunamadı'})
+        header = (self.headers.get('Content-Length') or '0').strip()
+        if not header.isdigit():
+            return self._send(400, {'error': 'Geçersiz Content-Length'})
+        length = int(header)
+        if length > MAX_REQUEST_BYTES:
+            return self._send(413, {'error': 'İstek çok büyük'})
+        try:
+            points = self.service.parse_points(json.loads(self.rfile.read(length) or b'null'))
+        except (TypeError, ValueError) as e:
+            return self._send(400, {'error': str(e)})
+        try:
+            job = self.service.submit(points)
+        except queue.Full:
+            return self._send(503, {'error': 'İş kuyruğu dolu, daha sonra tekrar deneyin'})
+        self._send(202, job.summary())
+
+    def do_GET(self):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['metrics']:
+            return self._send(200, self.service.metrics())
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                return self._send(404, {'error': 'İş bulunamadı'})
+            if len(parts) == 2:
+                return self._send(200, job.summary())
+            if parts[2] == 'result':
+                if job.status == 'done':
+                    return self._send(200, dict(job.summary(), **job.result))
+                return self._send(409 if job.status == 'failed' else 202, job.summary())
+        self._send(404, {'error': 'Bulunamadı'})
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(service: RoutingService, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> ThreadingHTTPServer:
+    handler = type('Handler', (RoutingRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Yerel HTTP rota hesaplama servisi")
+    parser.add_argument('--demand', default=DEMAND_FILE, help="Talep noktası dosyası (.xlsx veya .csv)")
+    parser.add_argument('--matrix-dir', default=MATRIX_DIR, help="Mesafe matrisi klasörü")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--workers', type=int, help="Çözücü süreç sayısı (varsayılan: işlemci sayısı)")
+    parser.add_argument('--queue-size', type=int, default=JOB_QUEUE_SIZE, help="Bekleyen en fazla iş sayısı")
+    parser.add_argument('--osm-graph', help=OSM_GRAPH_HELP)
+    args = parser.parse_args()
+
+    use_osm_graph(args.osm_graph)
+
+    locations, errors = load_demand_points(args.demand)
+    for err in errors:
+        print(f"Satır {err.row}: {err.message}")
+    service = RoutingService(locations, args.matrix_dir, args.workers, args.queue_size, args.osm_graph)
+    server = serve(service, args.host, args.port)
+    print(f"Rota servisi http://{args.host}:{args.port} adresinde {service.workers} çözücüyle çalışıyor")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
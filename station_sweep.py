@@ -0,0 +1,155 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+
+from arp import (BATCH_PROFILE_HELP, DEFAULT_VEHICLE_TYPE, DEMAND_FILE, MATRIX_DIR, OSM_GRAPH_HELP, RANDOM_SEED,
+                 STATION_PLACEMENT_METHODS, VEHICLE_TYPES, DistanceMatrix, PointStore, RoutePlanner, SharedArrays,
+                 get_osrm_table_blocked, load_demand_points, place_charging_stations, profiled_if, use_osm_graph)
+
+SWEEP_COUNTS = (2, 3, 4, 5, 6)
+WORKLOAD_ROUTES = 7  # temsilî iş yükündeki rota sayısı
+WORKLOAD_FRACTION = 0.6  # her rotada ziyaret edilen konum oranı
+SWEEP_COLUMNS = ('yontem', 'istasyon_sayisi', 'toplam_km', 'sarj_sapmasi_km', 'sarj_duraklari',
+                 'uygulanamayan', 'istasyon_yuku', 'sure_sn')
+
+def location_matrix(locations: PointStore, matrix_dir: str = MATRIX_DIR) -> DistanceMatrix:
+    """Konumlar arası matris: kayıtlıysa diskten açılır, yoksa bir kez hesaplanır (istasyonsuz)"""
+    matrix = DistanceMatrix.open_if_exists(matrix_dir)
+    if matrix is not None and (matrix.location_indexes(locations) == np.arange(len(locations))).all():
+        return matrix
+    n = len(locations)
+    distance, duration, estimated = get_osrm_table_blocked(locations.coords, locations.coords, return_estimated=True)
+    distance, duration = distance.astype(np.float32), duration.astype(np.float32)
+    return DistanceMatrix(distance, duration, locations.coords.copy(), n, [str(name) for name in locations.names],
+                          estimated if estimated.any() else None)
+
+def make_workload(locations: PointStore, n_routes: int = WORKLOAD_ROUTES, fraction: float = WORKLOAD_FRACTION,
+                  depot: int = 0, seed=RANDOM_SEED) -> List[np.ndarray]:
+    """Tohumlu temsilî iş yükü: her rota depo + rastgele seçilmiş konumların indeksleri"""
+    rng = np.random.default_rng(seed)
+    customers = np.delete(np.arange(len(locations)), depot)
+    size = max(1, int(round(len(customers) * fraction)))
+    return [np.concatenate([[depot], np.sort(rng.choice(customers, size, replace=False))]) for _ in range(n_routes)]
+
+# Her çalışan süreçte bir kez ayarlanır; yerleşimler arasında değişmeyen veriler
+_worker_state = {}
+
+def _init_worker(locations: PointStore, workload: List[np.ndarray], vehicle_type: str, seed):
+    _worker_state.update(locations=locations, workload=workload, vehicle_type=VEHICLE_TYPES[vehicle_type],
+                         seed=seed)
+
+def evaluate_layout(method: str, stations: PointStore, shared_matrix: SharedArrays) -> dict:
+    """Bir istasyon yerleşimini iş yükündeki tüm rotaları çözerek değerlendirir"""
+    started = time.perf_counter()
+    matrix = DistanceMatrix.from_shared(shared_matrix)
+    locations = _worker_state['locations']
+    planner = RoutePlanner(locations, stations, matrix=matrix, seed=_worker_state['seed'],
+                           vehicle_type=_worker_state['vehicle_type'])
+    total = detour = 0.0
+    stops = infeasible = 0
+    load = np.zeros(len(stations), dtype=np.int64)
+    for indexes in _worker_state['workload']:
+        points = locations.subset(indexes)
+        try:
+            plan = planner.plan_route(points)
+        except ValueError:
+            infeasible += 1
+            continue
+        n_points = len(points)
+        sequence = np.asarray(plan.sequence)
+        order = sequence[sequence < n_points]
+        distance = np.asarray(planner.route_matrices(points)[0], dtype=np.float64)
+        total += plan.distance
+        detour += plan.distance - float(distance[order[:-1], order[1:]].sum())
+        visited = sequence[sequence >= n_points] - n_points
+        stops += len(visited)
+        np.add.at(load, visited, 1)
+    return {
+        'yontem': method, 'istasyon_sayisi': len(stations), 'toplam_km': round(total, 3),
+        'sarj_sapmasi_km': round(detour, 3), 'sarj_duraklari': stops, 'uygulanamayan': infeasible,
+        'istasyon_yuku': '/'.join(str(count) for count in load), 'sure_sn': round(time.perf_counter() - started, 2),
+    }
+
+def sweep(locations: PointStore, counts=SWEEP_COUNTS, methods=STATION_PLACEMENT_METHODS, matrix_dir: str = MATRIX_DIR,
+          workload: List[np.ndarray] = None, vehicle_type: str = DEFAULT_VEHICLE_TYPE, workers: int = None,
+          seed=RANDOM_SEED) -> List[dict]:
+    """Yöntem x istasyon sayısı yerleşimlerini paralel olarak değerlendirir.
+
+    Konumlar arası matris bir kez açılır/hesaplanır; her yerleşim için yalnızca istasyon satır ve
+    sütunları bu süreçte (ortak rota önbellekleriyle) hesaplanır. Yerleşim matrisleri paylaşımlı belleğe
+    yazılır, çalışan süreçlere yalnızca tutamaçları gönderilir ve yerleşim değerlendirilince silinir.
+    """
+    workload = workload if workload is not None else make_workload(locations, seed=seed)
+    base = location_matrix(locations, matrix_dir)
+    layouts = [(method, place_charging_stations(locations, n, seed=seed, method=method))
+               for method in methods for n in counts]
+    shared = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                                 initargs=(locations, workload, vehicle_type, seed)) as pool:
+            futures = []
+            for method, stations in layouts:
+                shared.append(base.with_stations(stations).share())
+                futures.append(pool.submit(evaluate_layout, method, stations, shared[-1]))
+            results = []
+            for future, handle in zip(futures, shared):
+                results.append(future.result())
+                handle.close()
+            return results
+    finally:
+        for handle in shared:
+            handle.close()
+
+def parse_counts(text: str) -> List[int]:
+    """'2-6' ya da '2,4,8' biçimindeki istasyon sayıları"""
+    counts = []
+    for part in text.split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            counts.extend(range(int(low), int(high) + 1))
+        else:
+            counts.append(int(part))
+    return counts
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Şarj istasyonu yerleşim taraması")
+    parser.add_argument('--demand', default=DEMAND_FILE, help="Talep noktası dosyası (.xlsx veya .csv)")
+    parser.add_argument('--matrix-dir', default=MATRIX_DIR, help="Mesafe matrisi klasörü")
+    parser.add_argument('--counts', default='2-6', help="Denenecek istasyon sayıları (ör. 2-6 ya da 2,4,8)")
+    parser.add_argument('--methods', default=','.join(STATION_PLACEMENT_METHODS),
+                        help=f"Yerleştirme yöntemleri ({', '.join(STATION_PLACEMENT_METHODS)})")
+    parser.add_argument('--routes', type=int, default=WORKLOAD_ROUTES, help="İş yükündeki rota sayısı")
+    parser.add_argument('--fraction', type=float, default=WORKLOAD_FRACTION, help="Rota başına konum oranı")
+    parser.add_argument('--vehicle-type', default=DEFAULT_VEHICLE_TYPE, choices=sorted(VEHICLE_TYPES))
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--workers', type=int, help="Paralel süreç sayısı")
+    parser.add_argument('--output', default='istasyon_taramasi.csv', help="Sonuç CSV dosyası")
+    parser.add_argument('--osm-graph', help=OSM_GRAPH_HELP)
+    parser.add_argument('--profile', metavar='PREFIX', help=BATCH_PROFILE_HELP)
+    args = parser.parse_args()
+
+    use_osm_graph(args.osm_graph)
+
+    locations, errors = load_demand_points(args.demand)
+    for err in errors:
+        print(f"Satır {err.row}: {err.message}")
+    started = time.perf_counter()
+    with profiled_if(args.profile):
+        results = sweep(locations, parse_counts(args.counts), [m.strip() for m in args.methods.split(',')],
+                        args.matrix_dir, make_workload(locations, args.routes, args.fraction, seed=args.seed),
+                        args.vehicle_type, args.workers, args.seed)
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+    for row in sorted(results, key=lambda row: (row['uygulanamayan'], row['toplam_km'])):
+        print(f"{row['yontem']:9s} {row['istasyon_sayisi']:3d} istasyon  {row['toplam_km']:9.2f} km  "
+              f"sapma {row['sarj_sapmasi_km']:7.2f} km  yük {row['istasyon_yuku']}  "
+              f"uygulanamayan {row['uygulanamayan']}")
+    print(f"{len(results)} yerleşim {time.perf_counter() - started:.1f} sn içinde değerlendirildi -> {args.output}")
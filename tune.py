@@ -0,0 +1,159 @@
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import arp
+from osm_router import LocalRoutingEngine
+from perf_regression import INSTANCES, NETWORK_FILE, make_instance
+
+# Varsayılan arama uzayı; arp.py'deki sabitler bu değerlerden seçilecek
+PARAMETER_GRID = {
+    'population_size': (50, 100, 150),
+    'mutation_rate': (0.2, 0.35, 0.5),
+    'crossover_rate': (0.7, 0.9),
+    'n_mutations': (3, 7),
+}
+TUNE_SEEDS = (1, 2, 3)
+QUALITY_GAP = 0.01  # "iyi çözüm" eşiği: örnekteki en iyi bilinen maliyetin %1 yakını
+
+def prepare_instances(names, vehicle_type: str = arp.DEFAULT_VEHICLE_TYPE) -> dict:
+    """Her örnek için mesafe/enerji matrisini, istasyon düğümlerini ve tarama turunu bir kez hesaplar"""
+    prepared = {}
+    for name in names:
+        n_points, seed = INSTANCES[name]
+        points = make_instance(n_points, seed)
+        planner = arp.RoutePlanner(points, arp.place_charging_stations(points), vehicle_type=arp.VEHICLE_TYPES[vehicle_type])
+        distance = np.asarray(planner.route_matrices(points)[0], dtype=np.float64)
+        prepared[name] = {
+            'distance': distance, 'n_points': n_points, 'station_nodes': planner.station_nodes(points),
+            'energy': planner.vehicle_type.energy_matrix(distance),
+            'initial_tours': [1 + arp.sweep_order(points.coords[1:], points.coord(0))],
+        }
+    return prepared
+
+def parameter_sets(grid: dict, n_random: int = None, seed=arp.RANDOM_SEED):
+    """Izgaradaki tüm kombinasyonlar ya da ``n_random`` kadar rastgele kombinasyon"""
+    combinations = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if n_random is not None and n_random < len(combinations):
+        rng = np.random.default_rng(seed)
+        combinations = [combinations[i] for i in sorted(rng.choice(len(combinations), n_random, replace=False))]
+    return combinations
+
+_instances = {}
+
+def share_instances(instances: dict) -> dict:
+    """Örnek dizilerini (mesafe, enerji, istasyon düğümleri, tohum tur) paylaşımlı belleğe yazar"""
+    return {name: arp.SharedArrays.publish({'distance': instance['distance'], 'energy': instance['energy'],
+                                            'station_nodes': instance['station_nodes'],
+                                            'initial_tour': instance['initial_tours'][0]},
+                                           n_points=instance['n_points'])
+            for name, instance in instances.items()}
+
+def _init_worker(shared: dict):
+    for name, handle in shared.items():
+        arrays = handle.attach()
+        _instances[name] = {'distance': arrays['distance'], 'energy': arrays['energy'],
+                            'station_nodes': arrays['station_nodes'], 'initial_tours': [arrays['initial_tour']],
+                            'n_points': handle.meta['n_points'], 'shared': handle}
+
+def _run(run_id: int, name: str, params: dict, seed: int, time_budget: float) -> dict:
+    instance = _instances[name]
+    optimizer = arp.GeneticRouteOptimizer(
+        instance['distance'], instance['n_points'], instance['station_nodes'], energy=instance['energy'],
+        initial_tours=instance['initial_tours'], time_budget=time_budget, seed=seed, **params)
+    started = time.perf_counter()
+    best = optimizer.run()
+    return dict(run_id=run_id, ornek=name, tohum=seed, **params, sure_sn=time.perf_counter() - started,
+                nesil=optimizer.generations_run, maliyet=best.fitness, egri=optimizer.history)
+
+def tune(instances: dict, combinations, seeds=TUNE_SEEDS, time_budget: float = None, workers: int = None):
+    """Tüm (örnek, parametre, tohum) çalıştırmalarını paralel yürütür; (özet, eğri) tabloları döner.
+
+    Örnek matrisleri paylaşımlı belleğe bir kez yazılır; süreçler kopyalamadan bağlanır.
+    """
+    jobs = [(name, params, seed) for name in instances for params in combinations for seed in seeds]
+    shared = share_instances(instances)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                                 initargs=(shared,)) as pool:
+            futures = [pool.submit(_run, run_id, name, params, seed, time_budget)
+                       for run_id, (name, params, seed) in enumerate(jobs)]
+            runs = [future.result() for future in futures]
+    finally:
+        for handle in shared.values():
+            handle.close()
+
+    curves = pd.DataFrame([(run['run_id'], t, generation, cost) for run in runs for t, generation, cost in run['egri']],
+                          columns=['run_id', 'saniye', 'nesil', 'maliyet'])
+    summary = pd.DataFrame([{key: value for key, value in run.items() if key != 'egri'} for run in runs])
+    # Kalite, örnekteki en iyi bilinen maliyete göre; eşiğe ilk ulaşma süresi eğriden okunur
+    best_known = summary.groupby('ornek')['maliyet'].transform('min')
+    summary['fark'] = summary['maliyet'] / best_known - 1
+    threshold = dict(zip(summary['run_id'], best_known * (1 + QUALITY_GAP)))
+    reached = curves[curves['maliyet'] <= curves['run_id'].map(threshold)].groupby('run_id')['saniye'].min()
+    summary['esik_suresi_sn'] = summary['run_id'].map(reached)
+    return summary, curves
+
+def write_table(frame: pd.DataFrame, path: str) -> str:
+    """.parquet uzantısında pyarrow/fastparquet varsa Parquet, yoksa CSV yazar"""
+    if path.endswith('.parquet'):
+        try:
+            frame.to_parquet(path, index=False)
+            return path
+        except ImportError:
+            path = path[:-len('.parquet')] + '.csv'
+    frame.to_csv(path, index=False, quoting=csv.QUOTE_MINIMAL)
+    return path
+
+def parse_grid(items) -> dict:
+    """'population_size=50,100' biçimindeki ifadelerle varsayılan ızgarayı günceller"""
+    grid = dict(PARAMETER_GRID)
+    for item in items or ():
+        key, values = item.split('=')
+        if key not in grid:
+            raise ValueError(f"Bilinmeyen parametre: {key} (geçerli: {', '.join(grid)})")
+        cast = int if key in ('population_size', 'n_mutations') else float
+        grid[key] = tuple(cast(value) for value in values.split(','))
+    return grid
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GA parametre ızgarası / rastgele arama")
+    parser.add_argument('--grid', nargs='*', metavar='PARAM=V1,V2', help="Izgara değerlerini değiştir")
+    parser.add_argument('--random', type=int, help="Tüm ızgara yerine bu kadar rastgele kombinasyon dene")
+    parser.add_argument('--seeds', default=','.join(str(seed) for seed in TUNE_SEEDS), help="Virgülle ayrılmış tohumlar")
+    parser.add_argument('--instances', nargs='*', choices=sorted(INSTANCES), help="Kullanılacak örnekler")
+    parser.add_argument('--time-budget', type=float, help="Çalıştırma başına en uzun süre (sn)")
+    parser.add_argument('--vehicle-type', default=arp.DEFAULT_VEHICLE_TYPE, choices=sorted(arp.VEHICLE_TYPES))
+    parser.add_argument('--workers', type=int, help="Paralel süreç sayısı")
+    parser.add_argument('--output', default='ayar_sonuclari', help="Çıktı ön eki")
+    parser.add_argument('--format', default='csv', choices=('csv', 'parquet'))
+    parser.add_argument('--profile', metavar='PREFIX', help=arp.BATCH_PROFILE_HELP)
+    args = parser.parse_args()
+
+    arp.set_routing_backend(LocalRoutingEngine.from_file(NETWORK_FILE))
+    instances = prepare_instances(args.instances or INSTANCES, args.vehicle_type)
+    combinations = parameter_sets(parse_grid(args.grid), args.random)
+    seeds = [int(seed) for seed in args.seeds.split(',')]
+    print(f"{len(instances)} örnek x {len(combinations)} kombinasyon x {len(seeds)} tohum çalıştırılıyor")
+
+    started = time.perf_counter()
+    with arp.profiled_if(args.profile):
+        summary, curves = tune(instances, combinations, seeds, args.time_budget, args.workers)
+    outputs = [write_table(summary, f"{args.output}_ozet.{args.format}"),
+               write_table(curves, f"{args.output}_egriler.{args.format}")]
+
+    # Kombinasyon başına ortalama kalite farkı ve eşiğe ulaşma süresi (ulaşılamayan çalıştırmalar sonsuz sayılır)
+    params = list(PARAMETER_GRID)
+    ranking = (summary.assign(esik_suresi_sn=summary['esik_suresi_sn'].fillna(np.inf))
+               .groupby(params).agg(fark=('fark', 'mean'), esik_suresi_sn=('esik_suresi_sn', 'median'),
+                                    sure_sn=('sure_sn', 'mean'))
+               .sort_values(['esik_suresi_sn', 'fark']))
+    print(ranking.head(10).to_string())
+    print(f"{len(summary)} çalıştırma {time.perf_counter() - started:.1f} sn -> {', '.join(outputs)}")